@@ -1,15 +1,33 @@
+import json
 import sys
 import PyInstaller.__main__
 from pathlib import Path
 from PyInstaller.utils.hooks import collect_data_files
 import time
 
+try:
+    from ._wc_bundle_report import analyze
+except ImportError:
+    # Run as a script rather than imported from the package
+    from _wc_bundle_report import analyze
+
 SEP = '-'*100
 
+# dev keeps PyInstaller's analysis cache between builds and skips
+# bundling into one file; release matches a clean one-file build and
+# onedir is a clean build of a folder, which starts faster when installed
+PROFILE = sys.argv[1] if len(sys.argv) > 1 else '<build_profile>'
+HIDDEN_IMPORTS = '''
+<hidden_imports>
+'''.split()
+# Fail the build if the bundle is larger than this; 0 is no budget
+SIZE_BUDGET_MB = float('<size_budget_mb>' or 0)
+
 
 def build() -> None:
     start_time = time.time()
     DIST = Path(Path.cwd(), 'dist')
+    WORK = Path(Path.cwd(), 'build', 'pyinstaller-dev')
     HERE = Path(__file__).parent
     MAIN = Path(HERE, 'main.py')
     ICON_ICO = Path(HERE, 'images', 'icon.png')
@@ -18,12 +36,22 @@ def build() -> None:
 
     psiutils_datas = collect_data_files('psiutils')
 
-    print('\nBuilding <exe_name>.exe with PyInstaller...')
+    profiles = {
+        'dev': ['--onedir', f'--workpath={WORK}'],
+        'release': ['--onefile', '--clean'],
+        'onedir': ['--onedir', '--clean'],
+    }
+    if PROFILE not in profiles:
+        sys.exit(f'Unknown build profile {PROFILE}: '
+                 f'use {", ".join(profiles)}')
+    onedir = '--onedir' in profiles[PROFILE]
+
+    print(f'\nBuilding <exe_name>.exe ({PROFILE}) with PyInstaller...')
 
     # Start with base args
     args = [
         str(MAIN),
-        '--onefile',
+        *profiles[PROFILE],
         '--windowed',
         '--name=<exe_name>',
         f'--icon={ICON_ICO}',
@@ -31,17 +59,29 @@ def build() -> None:
         # f"--add-data={HERE / 'templates'}{sep}templates",
         f"--add-data={HERE / 'forms'}{sep}forms",
         f'--distpath={DIST}',
-        '--clean',
         '--noconfirm',
-        '--hidden-import=tkinter',
-        '--hidden-import=tkinterweb',
-        '--hidden-import=PIL._tkinter_finder',
     ]
+    args.extend(f'--hidden-import={name}' for name in HIDDEN_IMPORTS)
 
     args.extend(f'--add-data={src}{sep}{dest}' for src, dest in psiutils_datas)
     PyInstaller.__main__.run(args)
 
     exe_path = DIST / '<exe_name>.exe'
+    if onedir:
+        exe_path = DIST / '<exe_name>' / '<exe_name>.exe'
+    work_dir = Path(Path.cwd(), 'build', '<exe_name>')
+    if PROFILE == 'dev':
+        work_dir = WORK / '<exe_name>'
+    report = analyze(work_dir, exe_path.parent if onedir else exe_path,
+                     SIZE_BUDGET_MB)
+    print(SEP)
+    print(report.format())
+    Path(DIST, 'bundle-report.json').write_text(
+        json.dumps(report.to_dict(), indent=2), encoding='utf-8')
+    if report.over_budget:
+        sys.exit(f'FAILED: bundle is over its {SIZE_BUDGET_MB} MB budget')
+
+    print(SEP)
     print(f'SUCCESS: {exe_path}')
     print(SEP)
     print(f'Time taken: {int(time.time() - start_time)} secs')
@@ -1,5 +1,6 @@
 """Initialise the application."""
-from psiutils.utilities import psi_logger
+# psiutils.utilities imports tkinter; the logger itself does not
+from psiutils._logger import psi_logger
 from windows_converter.constants import APP_NAME
 
 logger = psi_logger(APP_NAME)
@@ -1,12 +1,57 @@
 import os
 import shutil
+import time
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-import subprocess
 
 from psiconfig import TomlConfig
-from psiutils.constants import Status
 
 from windows_converter import logger
+from windows_converter.fingerprint import (
+    DIST_DIR, FINGERPRINT_FILE, build_fingerprint, clear_fingerprint,
+    read_fingerprint, save_fingerprint)
+from windows_converter.import_graph import hidden_imports, import_graph
+from windows_converter.metrics import StageMetrics, count, measure
+from windows_converter.progress import ProgressReporter
+from windows_converter.projects import ONEDIR_PROFILES
+from windows_converter.requirements import create_requirements
+from windows_converter.sinks import (
+    SINK_DIRECTORY, DirectorySink, OutputSink, output_sink, sink_path)
+from windows_converter.stages import Stage, run_stages
+from windows_converter.sync import (
+    MANIFEST_FILE, SyncResult, read_manifest, save_manifest, sync_tree)
+from windows_converter.templates import INSTALLFORGE_PLACEHOLDER, render
+
+# Files in the build directory that record its state, not the project's
+BUILD_STATE_FILES = (MANIFEST_FILE, FINGERPRINT_FILE)
+# The installer's size for a one-file exe not built yet, as the
+# template listed before sizes were read from the dist tree
+ONEFILE_EXE_SIZE = '14 MB'
+# bundle.py as copied into the app's package, named not to collide
+BUNDLE_SCRIPT = '_wc_bundle_report.py'
+
+
+@dataclass
+class BuildReport:
+    status: int
+    duration: float = 0.0
+    files_copied: int = 0
+    bytes_copied: int = 0
+    stages: list[StageMetrics] = field(default_factory=list)
+    # Nothing was built because nothing changed since the last build
+    up_to_date: bool = False
+
+    def summary(self) -> list[tuple]:
+        """Return (stage, seconds, files, MB, peak MB) rows for display."""
+        return [
+            (stage.name,
+             round(stage.duration, 3),
+             stage.files,
+             round(stage.bytes / 1_000_000, 2),
+             round(stage.peak_memory / 1_000_000, 1))
+            for stage in self.stages
+        ]
 
 
 def build_project(
@@ -14,168 +59,458 @@ def build_project(
         config: TomlConfig,
         update_requirements: bool = False,
         testing: bool = False,
-        ) -> None:
-    """Create the project in windows-projects."""
+        incremental: bool = False,
+        reporter: ProgressReporter | None = None,
+        force: bool = False,
+        ) -> BuildReport:
+    """Create the project in windows-projects.
+
+    The build is a graph of stages (see _build_stages) and stages that
+    do not depend on each other run concurrently. In incremental mode
+    the previous build is kept and only the source and tests files that
+    have changed since then are copied.
+
+    If none of the build's inputs (see build_fingerprint) have changed
+    since the last complete build, nothing is done and the report is
+    up_to_date, unless force is set. Requirements are always rebuilt
+    when update_requirements is set, as the freeze cannot be predicted.
+
+    The output goes to config.output_sink (see sinks.OUTPUT_SINKS). An
+    archive is written straight from the development tree, unless
+    config.keep_build_dir is set, when the directory is built as usual
+    and then archived.
+
+    Progress is sent to reporter; cancelling it stops the build with
+    BuildCancelled. The report returned includes the metrics of every
+    stage.
+    """
     del testing
+    start_time = time.perf_counter()
+    project.resolve_directories()
     build_project_dir = Path(
         config.build_base_dir, project.name)
-    build_src_dir = Path(build_project_dir, 'src')
     target = Path(build_project_dir).parts[-1]
 
+    kind = config.output_sink
+    output_path = sink_path(kind, build_project_dir)
+    keep_dir = kind == SINK_DIRECTORY or config.keep_build_dir
+    fingerprint_path = Path(f'{output_path}{FINGERPRINT_FILE}')
+    if kind == SINK_DIRECTORY:
+        fingerprint_path = Path(build_project_dir, FINGERPRINT_FILE)
+
+    fingerprint = ''
+    if not update_requirements:
+        fingerprint = build_fingerprint(
+            project, config, read_manifest(build_project_dir))
+        if (not force and output_path.exists()
+                and fingerprint == read_fingerprint(fingerprint_path)):
+            logger.info(f'{target} is up to date')
+            return BuildReport(
+                status=project.status_ok,
+                duration=time.perf_counter() - start_time,
+                up_to_date=True)
+
     logger.info((f'Start building {project.dev_base_dir} '
                  f'to {target}'))
 
-    # Remove old project
-    if build_project_dir.is_dir():
-        shutil.rmtree(build_project_dir)
-    logger.info('Old project data removed')
-
-    _create_directories(project, build_project_dir, build_src_dir)
-    _create_tests_directory(project, build_project_dir)
-    _create_build_file(project, build_src_dir, 'pyinstaller.py')
-    _create_build_file(project, build_src_dir, 'pyinstaller_backend.py')
-    _create_build_file(project, Path(
-        build_src_dir, Path(project.dev_source_dir).parts[-1]), 'build_exe.py')
-    _create_build_file(project, build_project_dir, 'pyproject.toml')
-    _create_build_file(project, build_project_dir, 'justfile')
-    _create_readme(build_project_dir)
-    _create_installforge(project, build_project_dir)
-    _create_copy_requirements(project, build_src_dir, update_requirements)
-    logger.info('Build complete')
-    return project.status_ok
-
-
-def _create_directories(
-        project, build_project_dir: Path, build_src_dir: Path) -> None:
-    # Create project directory
-    build_project_dir.mkdir(parents=True, exist_ok=True)
-    logger.info(f'Created windows project dir {build_project_dir}')
-
-    # Create the code directory
-    build_src_dir.mkdir(parents=True, exist_ok=True)
-    logger.info(f'Created code dir {build_src_dir}')
-
-    # Create the setup directory
-    setup_dir = Path(build_project_dir, 'setup')
-    setup_dir.mkdir(parents=True, exist_ok=True)
-    logger.info(f'Created setup dir {setup_dir}')
-
-    # Build src directory
-    src_dir = Path(build_src_dir, project.name)
-    shutil.copytree(project.dev_source_dir, src_dir, dirs_exist_ok=True)
-    logger.info(f'Source copied to {src_dir}')
-
-
-def _create_tests_directory(project, build_project_dir: Path) -> None:
-    tests_dir = Path(build_project_dir, 'tests')
-    tests_dir.mkdir(parents=True, exist_ok=True)
+    mode = config.materialize_mode
+    manifest = {}
+    if incremental and not keep_dir:
+        logger.info(f'Writing a {kind} archive: full build')
+        incremental = False
+    if incremental:
+        manifest = read_manifest(build_project_dir)
+        if manifest and manifest.get('mode') != mode:
+            logger.info(f'Materialize mode changed to {mode}: full build')
+            incremental = False
+            manifest = {}
+    manifest['mode'] = mode
+
+    if not incremental and build_project_dir.is_dir():
+        # Remove old project
+        _remove_old_project(build_project_dir)
+        logger.info('Old project data removed')
+    # A build that stops part way must not look up to date
+    clear_fingerprint(fingerprint_path)
+
+    workers = config.copy_workers
+    sink = DirectorySink(build_project_dir, mode)
+    if not keep_dir:
+        sink = output_sink(kind, build_project_dir, mode, workers)
+    stage_metrics = []
+    try:
+        results = run_stages(_build_stages(
+            project,
+            sink,
+            build_project_dir,
+            manifest,
+            workers,
+            update_requirements,
+            reporter,
+            Path(config.data_directory),
+        ), reporter=reporter, metrics=stage_metrics)
+        if kind != SINK_DIRECTORY:
+            with measure('archive') as archive_metrics:
+                if keep_dir:
+                    sink = output_sink(kind, build_project_dir, mode, workers)
+                    _write_tree(build_project_dir, sink, '', reporter,
+                                'archive',
+                                skip=(*BUILD_STATE_FILES, DIST_DIR))
+                sink.close()
+            stage_metrics.append(archive_metrics)
+            logger.info(f'Created {sink.path}')
+    except BaseException:
+        sink.abort()
+        raise
+    if fingerprint:
+        save_fingerprint(fingerprint_path, fingerprint)
+    copied = [results['source'], results['tests']]
+    report = BuildReport(
+        status=project.status_ok,
+        duration=time.perf_counter() - start_time,
+        files_copied=sum(result.copied for result in copied),
+        bytes_copied=sum(result.bytes_copied for result in copied),
+        stages=stage_metrics,
+    )
+    logger.info(
+        'Build complete',
+        duration=round(report.duration, 3),
+        files_copied=report.files_copied,
+        bytes_copied=report.bytes_copied)
+    return report
+
+
+def _remove_old_project(build_project_dir: Path) -> None:
+    with os.scandir(build_project_dir) as entries:
+        for entry in entries:
+            if entry.name == DIST_DIR:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+
+
+def _build_stages(
+        project,
+        sink: OutputSink,
+        build_project_dir: Path,
+        manifest: dict,
+        workers: int,
+        update_requirements: bool,
+        reporter: ProgressReporter | None,
+        data_directory: Path) -> list[Stage]:
+    exe_dir = Path('src', Path(project.dev_source_dir).parts[-1]).as_posix()
+    # Filled in by the imports stage for the build_exe stage
+    analysis = {}
+    requirements_needs = ('build_dirs',)
+    stages = [
+        Stage('directories',
+              partial(_create_directories, sink),
+              provides=('build_dirs',)),
+        Stage('source',
+              partial(_create_source_directory, project, sink,
+                      manifest, workers, reporter),
+              requires=('build_dirs',),
+              provides=('source_tree',)),
+        Stage('tests',
+              partial(_create_tests_directory, project, sink,
+                      manifest, workers, reporter),
+              requires=('build_dirs',),
+              provides=('tests_tree',)),
+        Stage('build_files',
+              partial(_create_build_files, project, sink),
+              requires=('build_dirs',)),
+        Stage('imports',
+              partial(_analyze_imports, project, analysis,
+                      Path(data_directory, 'imports')),
+              provides=('hidden_imports',)),
+        Stage('build_exe',
+              partial(_create_build_file,
+                      project, sink, exe_dir, 'build_exe.py', analysis),
+              requires=('source_tree', 'hidden_imports')),
+        Stage('bundle_script',
+              partial(_copy_bundle_script, sink, exe_dir),
+              requires=('source_tree',)),
+        Stage('readme',
+              partial(_create_readme, sink),
+              requires=('build_dirs',)),
+        Stage('installforge',
+              partial(_create_installforge, project, sink, build_project_dir),
+              requires=('build_dirs',)),
+    ]
+    if isinstance(sink, DirectorySink):
+        stages.append(Stage(
+            'manifest',
+            partial(save_manifest, build_project_dir, manifest),
+            requires=('source_tree', 'tests_tree')))
+    if update_requirements:
+        # The freeze runs in the development directory so it can overlap
+        # everything else
+        stages.append(Stage('requirements',
+                            partial(create_requirements, project,
+                                    Path(data_directory, 'requirements')),
+                            provides=('requirements',)))
+        requirements_needs += ('requirements',)
+    stages.append(Stage('copy_requirements',
+                        partial(_copy_requirements, project, sink),
+                        requires=requirements_needs))
+    return stages
+
+
+def _create_directories(sink: OutputSink) -> None:
+    # Create project directory, the code directory and the setup directory
+    for name in ('src', 'setup'):
+        sink.write_directory(name)
+    logger.info(f'Created windows project dirs in {sink.path}')
+
+
+def _create_source_directory(
+        project,
+        sink: OutputSink,
+        manifest: dict,
+        workers: int,
+        reporter: ProgressReporter | None) -> SyncResult:
+    src_name = f'src/{project.name}'
+    result = _sync_to_sink(Path(project.dev_source_dir), sink, src_name,
+                           manifest, 'src', workers, reporter, 'source')
+    logger.info(
+        f'Source copied to {src_name}',
+        copied=result.copied,
+        unchanged=result.unchanged,
+        deleted=result.deleted)
+    return result
+
+
+def _create_tests_directory(
+        project,
+        sink: OutputSink,
+        manifest: dict,
+        workers: int,
+        reporter: ProgressReporter | None) -> SyncResult:
+    sink.write_directory('tests')
+    result = SyncResult()
     if project.tests_directory:
-        shutil.copytree(
-            project.tests_directory, tests_dir, dirs_exist_ok=True)
-    logger.info(f'Created tests dir {tests_dir}')
-
-
-def _create_build_file(project, target_dir: Path, file_name: str) -> None:
-    code = _get_text_file(file_name)
-    code = code.replace('<exe_name>', project.exe_name)
-    code = code.replace('<project>', project.name)
-    code = code.replace('<description>', project.description)
-    code = code.replace('<author>', project.author)
-    code = code.replace('<email>', project.email)
-    code = code.replace('<project>', project.name)
-    # code = code.replace('<project_dir>', project.win_base_dir)
-    code = code.replace('<version>', project.version)
-    # code = code.replace('<win_base_dir>', project.win_source_dir)
-    target_file = Path(target_dir, file_name)
-    _save_text_file(target_file, code)
+        result = _sync_to_sink(Path(project.tests_directory), sink, 'tests',
+                               manifest, 'tests', workers, reporter, 'tests')
+        logger.info(
+            'Created tests dir',
+            copied=result.copied,
+            unchanged=result.unchanged,
+            deleted=result.deleted)
+    else:
+        logger.info('Created tests dir')
+    return result
+
+
+def _sync_to_sink(
+        source_dir: Path,
+        sink: OutputSink,
+        name: str,
+        manifest: dict,
+        key: str,
+        workers: int,
+        reporter: ProgressReporter | None,
+        stage: str) -> SyncResult:
+    # Only a directory can be synced; an archive is always written whole
+    if isinstance(sink, DirectorySink):
+        result, manifest[key] = sync_tree(
+            source_dir,
+            Path(sink.path, name),
+            manifest.get(key, {}),
+            workers,
+            reporter,
+            stage,
+            sink.mode)
+        count(result.copied, result.bytes_copied)
+        return result
+    return _write_tree(source_dir, sink, name, reporter, stage)
+
+
+def _write_tree(
+        source_dir: Path,
+        sink: OutputSink,
+        name: str,
+        reporter: ProgressReporter | None,
+        stage: str,
+        skip: tuple[str, ...] = ()) -> SyncResult:
+    """Write every file under source_dir to sink, under name.
+
+    Files and directories named in skip are left out of the top level.
+    """
+    if reporter is None:
+        reporter = ProgressReporter()
+    result = SyncResult()
+    files = []
+    for directory_name, subdir_list, file_list in os.walk(source_dir):
+        if Path(directory_name) == Path(source_dir):
+            subdir_list[:] = [subdir for subdir in subdir_list
+                              if subdir not in skip]
+            file_list = [file_name for file_name in file_list
+                         if file_name not in skip]
+        relative_dir = Path(name, Path(directory_name).relative_to(source_dir))
+        if not subdir_list and not file_list:
+            sink.write_directory(relative_dir.as_posix())
+        files.extend((Path(directory_name, file_name),
+                      Path(relative_dir, file_name).as_posix())
+                     for file_name in file_list)
+    reporter.planned(len(files))
+
+    for path, relative in files:
+        reporter.check()
+        size = sink.write_file(relative, path)
+        reporter.copied(stage, size)
+        result.copied += 1
+        result.bytes_copied += size
+    count(result.copied, result.bytes_copied)
+    return result
+
+
+def _create_build_files(project, sink: OutputSink) -> None:
+    _create_build_file(project, sink, 'src', 'pyinstaller.py')
+    _create_build_file(project, sink, 'src', 'pyinstaller_backend.py')
+    _create_build_file(project, sink, '', 'pyproject.toml')
+    # just exe runs the exe that just build makes, for the project's profile
+    exe_path = f'dist\\{project.exe_name}.exe'
+    if project.build_profile in ONEDIR_PROFILES:
+        exe_path = f'dist\\{project.exe_name}\\{project.exe_name}.exe'
+    _create_build_file(
+        project, sink, '', 'justfile', {'exe_path': exe_path})
+
+
+def _create_build_file(
+        project,
+        sink: OutputSink,
+        target_dir: str,
+        file_name: str,
+        extra_values: dict | None = None) -> None:
+    values = {
+        'exe_name': project.exe_name,
+        'project': project.name,
+        'description': project.description,
+        'author': project.author,
+        'email': project.email,
+        'version': project.version,
+        'build_profile': project.build_profile,
+        'size_budget_mb': project.size_budget_mb,
+        **(extra_values or {}),
+    }
+    code = render(file_name, values)
+    _save_text_file(sink, Path(target_dir, file_name).as_posix(), code)
     logger.info(f'Created {file_name}')
 
 
-def _create_readme(build_project_dir: Path) -> None:
+def _analyze_imports(project, analysis: dict, cache_dir: Path) -> None:
+    graph = import_graph(
+        project.dev_source_dir, project.name, cache_dir=cache_dir)
+    hidden = hidden_imports(graph)
+    analysis['hidden_imports'] = '\n'.join(hidden)
+    logger.info('Hidden imports', hidden_imports=hidden)
+
+
+def _copy_bundle_script(sink: OutputSink, exe_dir: str) -> None:
+    # build_exe.py runs the size report with this after PyInstaller
+    source = Path(Path(__file__).parent, 'bundle.py')
+    _save_text_file(sink, f'{exe_dir}/{BUNDLE_SCRIPT}',
+                    source.read_text(encoding='utf-8'))
+    logger.info(f'Created {BUNDLE_SCRIPT}')
+
+
+def _create_readme(sink: OutputSink) -> None:
     file_name = 'README.md'
     code = ''
-    target_file = Path(build_project_dir, file_name)
-    _save_text_file(target_file, code)
+    _save_text_file(sink, file_name, code)
     logger.info(f'Created {file_name}')
 
 
-def _create_installforge(project, build_project_dir: Path) -> None:
+def _create_installforge(
+        project, sink: OutputSink, build_project_dir: Path) -> None:
     file_name = 'installforge.ifp'
-    code = _get_text_file(file_name)
-    code = code.replace('<<name>>', project.description)
-    code = code.replace('<<company name>>', project.company_name)
-    code = code.replace('<<windows directory>>', project.win_source_dir)
-    code = code.replace('<<exe name>>', project.exe_name)
-    code = code.replace('<<installation path>>', project.win_install_path)
-    code = code.replace('<<version>>', project.version)
-    code = code.replace('<<start menu text>>', project.start_menu_text)
-    target_file = Path(build_project_dir, f'{project.name}.ifp')
-    _save_text_file(target_file, code)
+    values = {
+        'name': project.description,
+        'company name': project.company_name,
+        'windows directory': project.win_source_dir,
+        'exe name': project.exe_name,
+        'installation path': project.win_install_path,
+        'version': project.version,
+        'start menu text': project.start_menu_text,
+        'files': _installforge_files(project, build_project_dir),
+    }
+    code = render(file_name, values, INSTALLFORGE_PLACEHOLDER)
+    _save_text_file(sink, f'{project.name}.ifp', code)
     logger.info(f'Created {file_name}')
 
 
-def _create_copy_requirements(
-        project, build_src_dir: Path, update_requirements: bool) -> None:
-    if update_requirements:
-        _create_requirements(project)
-    _copy_requirements(project, build_src_dir)
-
-
-def _create_requirements(project) -> int:
-    venv_python = Path(project.dev_base_dir, '.venv', 'bin', 'python')
-    req_path = Path(project.dev_base_dir, 'requirements.txt')
-
-    try:
-        subprocess.run(
-            [venv_python, '-m', 'ensurepip', '--upgrade'],
-            check=True,
-            capture_output=True)
-    except subprocess.CalledProcessError:
-        return Status.ERROR
-
-    try:
-        freeze = subprocess.run(
-            ['uv', 'pip', 'freeze', '--exclude-editable'],
-            capture_output=True,
-            text=True,
-            check=True,
-            cwd=project.dev_base_dir
-        )
-        lines = [line for line in freeze.stdout.splitlines()
-                 if not line.startswith('pygobject')]
-        req_path.write_text('\n'.join(lines) + '\n')
-        logger.info(
-            "Updated project dependencies"
-        )
-        return Status.OK
-    except Exception as e:
-        logger.warning(f'{req_path} not created', Exception=f'{e}')
-        return Status.ERROR
-
-
-def _copy_requirements(project, build_src_dir: Path) -> None:
+def _installforge_files(project, build_project_dir: Path) -> str:
+    """Return the [Files/Dirs] entries for the installer.
+
+    Each entry is the Windows path, the size and the type: the file's
+    extension, or Folder. A one-dir build installs the contents of
+    dist/<exe_name>, so the exe is still <InstallPath>\\<exe_name>.exe.
+    The sizes come from the dist tree PyInstaller left in the output
+    directory (full builds keep it). A one-file exe is always listed,
+    with ONEFILE_EXE_SIZE until it has been built; a one-dir build lists
+    nothing until PyInstaller has been run and the project built again.
+    """
+    dist_dir = Path(build_project_dir, DIST_DIR)
+    windows_dist = f'{project.win_source_dir}\\{DIST_DIR}'
+    exe_file = f'{project.exe_name}.exe'
+    names = {}
+    sizes = {}
+    if project.build_profile in ONEDIR_PROFILES:
+        dist_dir = Path(dist_dir, project.exe_name)
+        windows_dist = f'{windows_dist}\\{project.exe_name}'
+        if dist_dir.is_dir():
+            with os.scandir(dist_dir) as entries:
+                for entry in sorted(entries, key=lambda entry: entry.name):
+                    names[entry.name] = entry.is_dir()
+                    sizes[entry.name] = _installforge_size(
+                        _entry_size(entry))
+    else:
+        names[exe_file] = False
+        if Path(dist_dir, exe_file).is_file():
+            sizes[exe_file] = _installforge_size(
+                Path(dist_dir, exe_file).stat().st_size)
+    if not names:
+        logger.warning(
+            f'No {dist_dir}: the installer lists no files until '
+            f'PyInstaller has been run and the project built again')
+
+    lines = []
+    for name, is_dir in names.items():
+        lines.extend([
+            f'{windows_dist}\\{name}',
+            sizes.get(name, ONEFILE_EXE_SIZE),
+            'Folder' if is_dir else Path(name).suffix[1:].lower(),
+        ])
+    return '\n'.join(lines)
+
+
+def _entry_size(entry: os.DirEntry) -> int:
+    if not entry.is_dir(follow_symlinks=False):
+        return entry.stat().st_size
+    with os.scandir(entry.path) as entries:
+        return sum(_entry_size(child) for child in entries)
+
+
+def _installforge_size(size: int) -> str:
+    if size >= 1024 * 1024:
+        return f'{round(size / (1024 * 1024))} MB'
+    return f'{(size + 1023) // 1024} KB'
+
+
+def _copy_requirements(project, sink: OutputSink) -> None:
     file_name = 'requirements.txt'
     requirements_source = Path(
         Path(project.dev_base_dir), file_name)
     if requirements_source.is_file():
-        requirements_target = Path(
-            Path(build_src_dir).parent, file_name)
-        shutil.copyfile(requirements_source, requirements_target)
+        size = sink.write_file(file_name, requirements_source)
+        count(size=size)
         logger.info(f'Created {file_name}')
     else:
         logger.warning(f'No {file_name} in project source directory')
 
 
-def _get_text_file(file_name: str) -> str:
-    src_file = Path(Path(__file__).parent.parent, 'data', file_name)
-    try:
-        with open(src_file, 'r', encoding='utf-8') as f_source:
-            return f_source.read()
-    except FileNotFoundError:
-        logger.warning(f'{src_file} source not found')
-        return ''
-
-
-def _save_text_file(path: Path, data: str) -> None:
-    with open(path, 'w', encoding='utf-8') as f_target:
-        f_target.write(data)
+def _save_text_file(sink: OutputSink, name: str, data: str) -> None:
+    size = sink.write_bytes(name, data.encode('utf-8'))
+    count(size=size)
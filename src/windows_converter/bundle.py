@@ -0,0 +1,193 @@
+"""Size report of a PyInstaller bundle for Windows converter.
+
+This file is also copied next to the generated build_exe.py, as
+_wc_bundle_report.py, and run on Windows after PyInstaller, so it must
+only use the standard library.
+
+    python _wc_bundle_report.py <work_dir> <dist_path> [--budget MB]
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import sys
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+MB = 1_000_000
+
+SIZED_TYPECODES = {'PYMODULE', 'EXTENSION', 'BINARY', 'DATA', 'ZIPFILE'}
+MODULE_TYPECODES = {'PYMODULE', 'EXTENSION'}
+
+XREF_NODE = re.compile(r'<div class="node">\s*<a name="([^"]+)"></a>')
+XREF_IMPORTS = re.compile(
+    r'<div class="import">\s*imports:(.*?)</div>', re.DOTALL)
+XREF_LINK = re.compile(r'href="#([^"]+)"')
+WARN_MISSING = re.compile(r'^missing module named (\S+)', re.MULTILINE)
+
+
+@dataclass
+class BundleReport:
+    """Sizes in bytes of the bundle, its packages and its data files."""
+    total_size: int = 0
+    packages: dict[str, int] = field(default_factory=dict)
+    data_files: dict[str, int] = field(default_factory=dict)
+    missing_modules: list[str] = field(default_factory=list)
+    exclude_suggestions: list[str] = field(default_factory=list)
+    budget: int = 0
+
+    @property
+    def over_budget(self) -> bool:
+        return bool(self.budget) and self.total_size > self.budget
+
+    def format(self, top: int = 15) -> str:
+        lines = [f'Bundle size: {self.total_size / MB:.1f} MB']
+        if self.budget:
+            lines[0] += f' (budget {self.budget / MB:.1f} MB)'
+        lines.append('Largest packages:')
+        lines.extend(f'  {name:<32} {size / MB:>8.2f} MB'
+                     for name, size in _largest(self.packages, top))
+        lines.append('Largest data files:')
+        lines.extend(f'  {name:<50} {size / MB:>8.2f} MB'
+                     for name, size in _largest(self.data_files, top))
+        if self.exclude_suggestions:
+            lines.append('Never imported by the app; consider excluding:')
+            lines.extend(f'  --exclude-module={name}'
+                         for name in self.exclude_suggestions)
+        if self.missing_modules:
+            lines.append(
+                f'{len(self.missing_modules)} missing modules '
+                f'(see the warn file)')
+        return '\n'.join(lines)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def analyze(
+        work_dir: str,
+        dist_path: str,
+        budget_mb: float = 0) -> BundleReport:
+    """Report on the bundle PyInstaller built in work_dir.
+
+    dist_path is the one-file exe or the one-dir folder; its size is
+    the bundle's total size, compared with budget_mb if that is set.
+    """
+    work_dir = Path(work_dir)
+    report = BundleReport(
+        total_size=_path_size(Path(dist_path)),
+        budget=int(budget_mb * MB))
+
+    modules = set()
+    for name, path, typecode in _toc_entries(
+            Path(work_dir, 'Analysis-00.toc')):
+        if typecode in MODULE_TYPECODES:
+            modules.add(name)
+        if typecode not in SIZED_TYPECODES or not path:
+            continue
+        size = _path_size(Path(path))
+        if typecode == 'DATA':
+            report.data_files[name] = size
+        package = re.split(r'[./\\]', name)[0]
+        report.packages[package] = report.packages.get(package, 0) + size
+
+    xref = _read_text(_first(work_dir, 'xref-*.html'))
+    if xref:
+        report.exclude_suggestions = _unreachable_packages(xref, modules)
+    warn = _read_text(_first(work_dir, 'warn-*.txt'))
+    report.missing_modules = sorted(set(WARN_MISSING.findall(warn)))
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('work_dir', help="PyInstaller's workpath/<name>")
+    parser.add_argument('dist_path', help='the exe or one-dir folder')
+    parser.add_argument('--budget', type=float, default=0,
+                        help='fail if the bundle is larger (MB)')
+    parser.add_argument('--json', help='also write the report here')
+    args = parser.parse_args(argv)
+
+    report = analyze(args.work_dir, args.dist_path, args.budget)
+    print(report.format())
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps(report.to_dict(), indent=2), encoding='utf-8')
+    if report.over_budget:
+        print(f'Bundle exceeds its {args.budget} MB budget')
+        return 1
+    return 0
+
+
+def _toc_entries(toc_path: Path) -> list[tuple[str, str, str]]:
+    try:
+        data = ast.literal_eval(toc_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError, SyntaxError):
+        return []
+    # The guts are a tuple of values; the TOCs are lists of 3-tuples
+    entries = []
+    for value in data if isinstance(data, tuple) else ():
+        if isinstance(value, list):
+            entries.extend(
+                entry for entry in value
+                if isinstance(entry, tuple) and len(entry) == 3
+                and all(isinstance(item, str) or item is None
+                        for item in entry))
+    return entries
+
+
+def _unreachable_packages(xref: str, modules: set[str]) -> list[str]:
+    """Return bundled top-level packages no script reaches."""
+    graph = {}
+    for match, block in zip(XREF_NODE.finditer(xref),
+                            re.split(r'<div class="node">', xref)[1:]):
+        imports = XREF_IMPORTS.search(block)
+        graph[match.group(1)] = (
+            XREF_LINK.findall(imports.group(1)) if imports else [])
+
+    # Hidden imports are graph roots too, so start only from scripts
+    reached = set()
+    queue = deque(name for name in graph if name.endswith('.py'))
+    while queue:
+        name = queue.popleft()
+        if name in reached:
+            continue
+        reached.add(name)
+        queue.extend(graph.get(name, ()))
+
+    packages = {module.split('.')[0] for module in modules}
+    reached_packages = {name.split('.')[0] for name in reached}
+    return sorted(packages - reached_packages)
+
+
+def _path_size(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    total = 0
+    for directory_name, _, file_list in os.walk(path):
+        for file_name in file_list:
+            total += os.path.getsize(os.path.join(directory_name, file_name))
+    return total
+
+
+def _largest(sizes: dict[str, int], top: int) -> list[tuple[str, int]]:
+    return sorted(sizes.items(), key=lambda item: -item[1])[:top]
+
+
+def _first(directory: Path, pattern: str) -> Path | None:
+    return next(iter(sorted(directory.glob(pattern))), None)
+
+
+def _read_text(path: Path | None) -> str:
+    if path is None:
+        return ''
+    try:
+        return path.read_text(encoding='utf-8', errors='replace')
+    except OSError:
+        return ''
+
+
+if __name__ == '__main__':
+    sys.exit(main())
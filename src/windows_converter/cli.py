@@ -0,0 +1,143 @@
+"""Command line interface for Windows converter.
+
+    windows-converter                  open the GUI
+    windows-converter project <id>     open a GUI form, as main.py does
+    windows-converter build <id> ...   build a project without the GUI
+    windows-converter analyze ...      report on a PyInstaller bundle
+
+Nothing imported for a build uses tkinter, so builds run where there is
+no display.
+"""
+import argparse
+import sys
+
+from windows_converter.config import get_config
+from windows_converter.progress import BuildCancelled
+from windows_converter.projects import BUILD_PROFILES, get_project_server
+from windows_converter import logger
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_UNKNOWN_PROJECT = 3
+EXIT_PROBLEMS = 4
+EXIT_CANCELLED = 130
+
+# Any other first argument is a GUI module, e.g. project or config
+COMMANDS = ('build', 'analyze')
+
+
+def main(argv: list[str] | None = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and not argv[0].startswith('-') and argv[0] not in COMMANDS:
+        return _run_gui(argv)
+    args = _parser().parse_args(argv)
+    if args.command is None:
+        return _run_gui([])
+    return args.func(args)
+
+
+def build(args: argparse.Namespace) -> int:
+    """Build one project and return the exit code."""
+    project = get_project_server().projects.get(args.project_id)
+    if project is None:
+        logger.error('Unknown project', project=args.project_id)
+        return EXIT_UNKNOWN_PROJECT
+
+    if args.profile:
+        project.build_profile = args.profile
+
+    problems = project.problems()
+    for problem in problems:
+        logger.error('Project problem', project=project.id, problem=problem)
+    if problems and not args.ignore_problems:
+        return EXIT_PROBLEMS
+
+    try:
+        report = project.build(
+            get_config(),
+            update_requirements=args.update_requirements,
+            incremental=args.incremental,
+            force=args.force)
+    except BuildCancelled:
+        logger.warning('Build cancelled', project=project.id)
+        return EXIT_CANCELLED
+    except Exception:
+        logger.exception('Build failed', project=project.id)
+        return EXIT_FAILED
+
+    if report.status != project.status_ok:
+        logger.error('Build failed', project=project.id)
+        return EXIT_FAILED
+    if report.up_to_date:
+        print(f'{project.id} is up to date')
+        return EXIT_OK
+    for row in report.summary():
+        print('{:<20} {:>8.3f}s {:>6} files {:>9.2f} MB'.format(*row[:4]))
+    return EXIT_OK
+
+
+def analyze(args: argparse.Namespace) -> int:
+    """Report on a bundle PyInstaller has built and check its budget."""
+    from windows_converter.bundle import analyze as analyze_bundle
+
+    report = analyze_bundle(args.work_dir, args.dist_path, args.budget)
+    print(report.format())
+    if report.over_budget:
+        logger.error('Bundle over budget', size=report.total_size,
+                     budget=report.budget)
+        return EXIT_FAILED
+    return EXIT_OK
+
+
+def _run_gui(argv: list[str]) -> int:
+    # The GUI reads its own arguments from sys.argv
+    from windows_converter.main import main as gui_main
+    sys.argv = [*sys.argv[:1], *argv]
+    gui_main()
+    return EXIT_OK
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='windows-converter',
+        epilog='Other arguments, e.g. project <id>, open the GUI with them.')
+    parser.set_defaults(command=None)
+    commands = parser.add_subparsers(dest='command')
+
+    build_parser = commands.add_parser(
+        'build', help='build a project without the GUI')
+    build_parser.add_argument('project_id')
+    build_parser.add_argument(
+        '--update-requirements', action='store_true',
+        help='freeze the project requirements first')
+    build_parser.add_argument(
+        '--incremental', action='store_true',
+        help='only copy files changed since the last build')
+    build_parser.add_argument(
+        '--force', action='store_true',
+        help='build even if nothing has changed since the last build')
+    build_parser.add_argument(
+        '--profile', choices=BUILD_PROFILES,
+        help="PyInstaller profile, instead of the project's own")
+    build_parser.add_argument(
+        '--ignore-problems', action='store_true',
+        help='build even if icons or main.py are missing')
+    build_parser.set_defaults(func=build)
+
+    analyze_parser = commands.add_parser(
+        'analyze', help='report on the size of a PyInstaller bundle')
+    analyze_parser.add_argument(
+        'work_dir', help="PyInstaller's workpath for the exe")
+    analyze_parser.add_argument(
+        'dist_path', help='the one-file exe or one-dir folder')
+    analyze_parser.add_argument(
+        '--budget', type=float, default=0,
+        help='fail if the bundle is larger (MB)')
+    analyze_parser.set_defaults(func=analyze)
+    return parser
+
+
+if __name__ == '__main__':
+    sys.exit(main())
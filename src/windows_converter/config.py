@@ -1,4 +1,7 @@
 """Config for Windows converter."""
+import atexit
+import os
+import threading
 from pathlib import Path
 from psiconfig import TomlConfig
 
@@ -14,13 +17,32 @@ DEFAULT_CONFIG = {
     'email': '',
     'windows_project_directory': '',
     'windows_installation': '',
+    'incremental_build': False,
+    'copy_workers': 8,
+    'materialize_mode': 'copy',
+    'output_sink': 'directory',
+    'keep_build_dir': False,
+    'build_workers': 4,
+    'project_store': 'sqlite',
+    'check_imports': True,
     'geometry': {
         'frm_main': '500x600',
         'frm_project': '900x650',
-        'frm_config': '700x300',
+        'frm_config': '700x420',
+        'frm_build_report': '520x320',
     },
 }
 
+# Deferred updates are saved at most this often (seconds)
+FLUSH_DELAY = 0.5
+
+_cache: dict[str, tuple[tuple, TomlConfig]] = {}
+_cache_lock = threading.Lock()
+
+_pending: dict[str, dict[str, object]] = {}
+_pending_lock = threading.Lock()
+_flush_timer: threading.Timer | None = None
+
 
 def read_config(path: str = '') -> TomlConfig:
     """Return the config file."""
@@ -28,6 +50,107 @@ def read_config(path: str = '') -> TomlConfig:
         path = CONFIG_PATH
     return TomlConfig(path=path, defaults=DEFAULT_CONFIG)
 
+
+def get_config(path: str = '') -> TomlConfig:
+    """Return the process's shared config for path.
+
+    The file is parsed once and only read again when its mtime or size
+    changes, so every caller gets the same TomlConfig instance.
+    """
+    path = Path(path or CONFIG_PATH)
+    key = str(path)
+    with _cache_lock:
+        signature = _signature(path)
+        cached = _cache.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+        toml_config = _SharedConfig(path=path, defaults=DEFAULT_CONFIG)
+        _cache[key] = (_signature(path), toml_config)
+        return toml_config
+
+
+class _SharedConfig(TomlConfig):
+    def save(self):
+        # Deferred updates are saved on a timer thread. Writing a temporary
+        # file and renaming it under the cache lock means get_config() never
+        # reads a half-written file, in this process or another.
+        path = Path(self.path)
+        temp_path = Path(f'{path}.tmp')
+        with _cache_lock:
+            self.path = temp_path
+            try:
+                result = super().save()
+            finally:
+                self.path = path
+            if result != self.STATUS_OK:
+                temp_path.unlink(missing_ok=True)
+                return result
+            os.replace(temp_path, path)
+            # Saving re-reads the file, so this instance is still current
+            key = str(path)
+            if key in _cache and _cache[key][1] is self:
+                _cache[key] = (_signature(path), self)
+        return result
+
+
+def _signature(path: Path) -> tuple:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return (None, None)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def defer_update(field: str, value: object, path: str = '') -> None:
+    """Update field in the shared config now and save it soon.
+
+    Updates made within FLUSH_DELAY of each other are written in one
+    save; anything still pending is saved when the process exits.
+    """
+    global _flush_timer
+    key = str(Path(path or CONFIG_PATH))
+    with _pending_lock:
+        get_config(key).update(field, value)
+        _pending.setdefault(key, {})[field] = value
+        if _flush_timer is None:
+            _flush_timer = threading.Timer(FLUSH_DELAY, flush_config)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+
+
+def flush_config() -> None:
+    """Save any deferred config updates."""
+    global _flush_timer
+    with _pending_lock:
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+        pending = dict(_pending)
+        _pending.clear()
+        # The shared config is re-read if the file changed since the
+        # updates were made, so apply them again before saving
+        for key, fields in pending.items():
+            toml_config = get_config(key)
+            for field, value in fields.items():
+                toml_config.update(field, value)
+            toml_config.save()
+
+
+def window_resize(master, file: str, *args) -> None:
+    """Record the geometry of master's window, saving it deferred."""
+    # The same geometry psiutils.utilities.window_resize records
+    root = master.root
+    match = root.geometry().split('+')
+    window_geometry = (
+        f'{root.winfo_width()}x{root.winfo_height()}+'
+        f'{root.winfo_x()}+{match[2]}')
+    geometry = dict(get_config().geometry)
+    if geometry.get(Path(file).stem) == window_geometry:
+        return
+    geometry[Path(file).stem] = window_geometry
+    defer_update('geometry', geometry)
+
+
 def save_config(toml_config: TomlConfig) -> TomlConfig | None:
     # NB new attributes need to be updated in gui.write_config
     result = toml_config.save()
@@ -36,4 +159,4 @@ def save_config(toml_config: TomlConfig) -> TomlConfig | None:
     return TomlConfig(CONFIG_PATH)
 
 
-config = read_config()
+atexit.register(flush_config)
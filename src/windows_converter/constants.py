@@ -15,6 +15,8 @@ HELP_URI = ''
 CONFIG_PATH = Path(user_config_dir(APP_NAME, APP_AUTHOR), 'config.toml')
 USER_DATA_DIR = user_data_dir(APP_NAME, APP_AUTHOR)
 PROJECT_FILE = Path(USER_DATA_DIR, 'projects.json')
+PROJECT_DB = Path(USER_DATA_DIR, 'projects.db')
+PROJECT_JOURNAL = Path(USER_DATA_DIR, 'projects.jsonl')
 HOME = str(Path.home())
 
 # GUI
@@ -0,0 +1,147 @@
+"""File copy and link engine for Windows converter."""
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+DEFAULT_WORKERS = 8
+CHUNK_SIZE = 64 * 1024 * 1024
+STREAM_BUFFER_SIZE = 1024 * 1024
+
+MODE_COPY = 'copy'
+MODE_HARDLINK = 'hardlink'
+MODE_REFLINK = 'reflink'
+MODE_SYMLINK = 'symlink'
+MATERIALIZE_MODES = (MODE_COPY, MODE_HARDLINK, MODE_REFLINK, MODE_SYMLINK)
+
+# Linux ioctl to share the extents of one file with another (btrfs, xfs)
+FICLONE = 0x40049409
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def materialize_file(
+        source: Path, target: Path, mode: str = MODE_COPY) -> int:
+    """Make target a copy of, or a link to, source and return its size.
+
+    If the link cannot be made (e.g. the build directory is on another
+    filesystem or symlinks need privileges) the file is copied instead.
+    """
+    if mode not in MATERIALIZE_MODES:
+        raise ValueError(f'Invalid materialize mode: {mode}')
+    if mode == MODE_COPY:
+        return copy_file(source, target)
+
+    remove_file(target)
+    try:
+        if mode == MODE_HARDLINK:
+            os.link(source, target)
+        elif mode == MODE_SYMLINK:
+            os.symlink(Path(source).resolve(), target)
+        else:
+            _reflink_file(source, target)
+    except OSError:
+        return copy_file(source, target)
+    return os.stat(source).st_size
+
+
+def remove_file(target: Path) -> None:
+    """Remove target so that nothing is written through a link."""
+    if target.is_symlink() or target.exists():
+        target.unlink()
+
+
+def copy_file(source: Path, target: Path) -> int:
+    """Copy source to target with metadata and return the bytes copied.
+
+    The fastest mechanism the platform offers is used: a reflink, then
+    copy_file_range, then sendfile and finally a buffered stream.
+    """
+    # Never write through an existing (possibly linked) target
+    remove_file(target)
+
+    with open(source, 'rb') as f_source, open(target, 'wb') as f_target:
+        size = os.fstat(f_source.fileno()).st_size
+        if size and not _reflink(f_source, f_target):
+            _copy_data(f_source, f_target, size)
+    shutil.copystat(source, target)
+    return size
+
+
+def copy_file_hashed(source: Path, target: Path) -> tuple[int, str]:
+    """Copy source to target and return its size and sha256 digest.
+
+    The data is read once and hashed on its way through, which is
+    cheaper than hashing the file and then copying it with a kernel copy.
+    """
+    remove_file(target)
+
+    digest = hashlib.sha256()
+    size = 0
+    with open(source, 'rb') as f_source, open(target, 'wb') as f_target:
+        while chunk := f_source.read(STREAM_BUFFER_SIZE):
+            digest.update(chunk)
+            f_target.write(chunk)
+            size += len(chunk)
+    shutil.copystat(source, target)
+    return size, digest.hexdigest()
+
+
+def _reflink_file(source: Path, target: Path) -> None:
+    with open(source, 'rb') as f_source, open(target, 'wb') as f_target:
+        if not _reflink(f_source, f_target):
+            raise OSError(f'Cannot reflink {source}')
+    shutil.copystat(source, target)
+
+
+def _reflink(f_source, f_target) -> bool:
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(f_target.fileno(), FICLONE, f_source.fileno())
+    except OSError:
+        return False
+    return True
+
+
+def _copy_data(f_source, f_target, size: int) -> None:
+    for kernel_copy in (_copy_file_range, _sendfile):
+        try:
+            if kernel_copy(f_source.fileno(), f_target.fileno(), size):
+                return
+        except OSError:
+            pass
+        # Restart from the beginning with the next mechanism
+        f_source.seek(0)
+        f_target.seek(0)
+        f_target.truncate()
+    shutil.copyfileobj(f_source, f_target, STREAM_BUFFER_SIZE)
+
+
+def _copy_file_range(source_fd: int, target_fd: int, size: int) -> bool:
+    if not hasattr(os, 'copy_file_range'):
+        return False
+    offset = 0
+    while offset < size:
+        copied = os.copy_file_range(
+            source_fd, target_fd, min(CHUNK_SIZE, size - offset))
+        if not copied:
+            break
+        offset += copied
+    return offset == size
+
+
+def _sendfile(source_fd: int, target_fd: int, size: int) -> bool:
+    if not hasattr(os, 'sendfile'):
+        return False
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(
+            target_fd, source_fd, offset, min(CHUNK_SIZE, size - offset))
+        if not sent:
+            break
+        offset += sent
+    return offset == size
@@ -0,0 +1,109 @@
+"""Fingerprint of everything a build reads for Windows converter."""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from psiconfig import TomlConfig
+
+from windows_converter.sync import file_hash
+from windows_converter.templates import DATA_DIR
+
+FINGERPRINT_FILE = '.build_fingerprint'
+# PyInstaller's output, copied back from the build machine; full builds
+# keep it in the output directory and archives leave it out
+DIST_DIR = 'dist'
+# Change this when the build's output changes for the same inputs
+FINGERPRINT_VERSION = 1
+
+# Copied into every build, so part of its input like the templates
+BUILD_SCRIPTS = (Path(Path(__file__).parent, 'bundle.py'),)
+
+
+def build_fingerprint(project, config: TomlConfig, manifest: dict) -> str:
+    """Return a digest of the inputs to the project's build.
+
+    The inputs are the source and tests files, requirements.txt, the
+    templates, the project's settings, the config used to build and the
+    size and mtime of the files in the dist tree in the output directory.
+    A file whose size and mtime match its entry in the build manifest
+    is not hashed again.
+    """
+    digest = hashlib.sha256()
+
+    def _add(label: str, value: str) -> None:
+        digest.update(f'{label}\0{value}\0'.encode('utf-8'))
+
+    _add('version', str(FINGERPRINT_VERSION))
+    _add('project', json.dumps(vars(project), sort_keys=True, default=str))
+    _add('config', json.dumps([
+        config.build_base_dir, config.materialize_mode, config.output_sink,
+        config.keep_build_dir], default=str))
+
+    trees = {'src': project.dev_source_dir, 'tests': project.tests_directory}
+    for key, directory in trees.items():
+        if directory:
+            for relative, hash_ in _tree_hashes(
+                    Path(directory), manifest.get(key, {})):
+                _add(f'{key}/{relative}', hash_)
+
+    requirements = Path(project.dev_base_dir, 'requirements.txt')
+    if requirements.is_file():
+        _add('requirements', file_hash(requirements))
+
+    # The installer lists the dist tree, so a new PyInstaller build counts
+    dist_dir = Path(config.build_base_dir, project.name, DIST_DIR)
+    for relative, stat in _tree_stats(dist_dir):
+        _add(f'dist/{relative}', f'{stat.st_size}:{stat.st_mtime_ns}')
+
+    templates = sorted(path for path in DATA_DIR.iterdir() if path.is_file())
+    for path in [*templates, *BUILD_SCRIPTS]:
+        _add(f'template/{path.name}', file_hash(path))
+    return digest.hexdigest()
+
+
+def read_fingerprint(path: Path) -> str:
+    """Return the fingerprint of the last complete build, if any."""
+    try:
+        return Path(path).read_text(encoding='utf-8').strip()
+    except OSError:
+        return ''
+
+
+def save_fingerprint(path: Path, fingerprint: str) -> None:
+    Path(path).write_text(fingerprint, encoding='utf-8')
+
+
+def clear_fingerprint(path: Path) -> None:
+    """Forget the last build, which this build is about to change."""
+    Path(path).unlink(missing_ok=True)
+
+
+def _tree_stats(source_dir: Path) -> list[tuple[str, os.stat_result]]:
+    stats = []
+    for directory_name, subdir_list, file_list in os.walk(source_dir):
+        subdir_list.sort()
+        relative_dir = Path(directory_name).relative_to(source_dir)
+        for file_name in sorted(file_list):
+            stats.append((Path(relative_dir, file_name).as_posix(),
+                          Path(directory_name, file_name).stat()))
+    return stats
+
+
+def _tree_hashes(source_dir: Path, entries: dict) -> list[tuple[str, str]]:
+    # The same walk as sync_tree, so the manifest's entries line up
+    hashes = []
+    for directory_name, subdir_list, file_list in os.walk(source_dir):
+        subdir_list.sort()
+        relative_dir = Path(directory_name).relative_to(source_dir)
+        for file_name in sorted(file_list):
+            path = Path(directory_name, file_name)
+            relative = Path(relative_dir, file_name).as_posix()
+            stat = path.stat()
+            entry = entries.get(relative)
+            if (entry and entry['size'] == stat.st_size
+                    and entry['mtime'] == stat.st_mtime_ns):
+                hashes.append((relative, entry['hash']))
+            else:
+                hashes.append((relative, file_hash(path)))
+    return hashes
@@ -0,0 +1,93 @@
+"""BuildReportFrame for Windows converter."""
+
+import tkinter as tk
+from tkinter import ttk
+from pathlib import Path
+
+from psiutils.buttons import ButtonFrame
+from psiutils.constants import PAD
+
+from windows_converter.build import BuildReport
+from windows_converter.config import (
+    DEFAULT_CONFIG, get_config, window_resize)
+from windows_converter.constants import APP_TITLE
+
+FRAME_TITLE = f'{APP_TITLE} - Build report'
+
+COLUMNS = {
+    'stage': ('Stage', 160, tk.W),
+    'duration': ('Time (s)', 80, tk.E),
+    'files': ('Files', 80, tk.E),
+    'megabytes': ('MB', 80, tk.E),
+    'peak_memory': ('Peak MB', 80, tk.E),
+}
+
+
+class BuildReportFrame():
+    def __init__(self, parent: tk.Frame, report: BuildReport) -> None:
+        self.root = tk.Toplevel(parent.root)
+        self.parent = parent
+        self.report = report
+        self.config = get_config()
+
+        self._show()
+
+    def _show(self) -> None:
+        root = self.root
+        stem = Path(__file__).stem
+        root.geometry(self.config.geometry.get(
+            stem, DEFAULT_CONFIG['geometry'][stem]))
+        root.transient(self.parent.root)
+        root.title(FRAME_TITLE)
+        root.bind('<Configure>',
+                  lambda e: window_resize(self, __file__))
+
+        root.rowconfigure(0, weight=1)
+        root.columnconfigure(0, weight=1)
+
+        main_frame = self._main_frame(root)
+        main_frame.grid(row=0, column=0, sticky=tk.NSEW, padx=PAD, pady=PAD)
+        self.button_frame = self._button_frame(root)
+        self.button_frame.grid(row=8, column=0, columnspan=9,
+                               sticky=tk.EW, padx=PAD, pady=PAD)
+
+        sizegrip = ttk.Sizegrip(root)
+        sizegrip.grid(sticky=tk.SE)
+
+    def _main_frame(self, master: tk.Frame) -> ttk.Frame:
+        frame = ttk.Frame(master)
+        frame.rowconfigure(0, weight=1)
+        frame.columnconfigure(0, weight=1)
+
+        tree = ttk.Treeview(frame, columns=list(COLUMNS), show='headings')
+        for column, (heading, width, anchor) in COLUMNS.items():
+            tree.heading(column, text=heading, anchor=anchor)
+            tree.column(column, width=width, anchor=anchor)
+        for row in sorted(self.report.summary(), key=lambda row: -row[1]):
+            tree.insert('', tk.END, values=row)
+        tree.grid(row=0, column=0, sticky=tk.NSEW)
+
+        scrollbar = ttk.Scrollbar(
+            frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.grid(row=0, column=1, sticky=tk.NS)
+
+        megabytes = self.report.bytes_copied / 1_000_000
+        label = ttk.Label(
+            frame,
+            text=(f'Total {self.report.duration:.2f} s, '
+                  f'{self.report.files_copied} files, {megabytes:.1f} MB'))
+        label.grid(row=1, column=0, sticky=tk.W, pady=PAD)
+
+        return frame
+
+    def _button_frame(self, master: tk.Frame) -> tk.Frame:
+        frame = ButtonFrame(master, tk.HORIZONTAL)
+        frame.buttons = [
+            frame.icon_button('exit', self._dismiss),
+        ]
+        frame.enable(False)
+        return frame
+
+    def _dismiss(self, *args) -> None:
+        self.root.destroy()
@@ -6,10 +6,12 @@ from pathlib import Path
 
 from psiutils.buttons import ButtonFrame
 from psiutils.constants import PAD
-from psiutils.utilities import window_resize
 
-from windows_converter.config import read_config
+from windows_converter.config import get_config, window_resize
+from windows_converter.copier import MATERIALIZE_MODES
 from windows_converter.constants import APP_TITLE
+from windows_converter.projects import STORE_PATHS, switch_project_store
+from windows_converter.sinks import OUTPUT_SINKS
 from windows_converter.text import Text
 from windows_converter import logger
 
@@ -22,6 +24,10 @@ FIELDS = {
     'windows_project_directory': tk.StringVar,
     'author': tk.StringVar,
     'email': tk.StringVar,
+    'materialize_mode': tk.StringVar,
+    'project_store': tk.StringVar,
+    'output_sink': tk.StringVar,
+    'keep_build_dir': tk.BooleanVar,
 }
 
 
@@ -30,12 +36,14 @@ class ConfigFrame():
         # pylint: disable=no-member)
         self.root = tk.Toplevel(parent.root)
         self.parent = parent
-        config = read_config()
+        config = get_config()
         self.config = config
 
         for field, f_type in FIELDS.items():
             if f_type is tk.StringVar:
                 setattr(self, field, self._stringvar(getattr(config, field)))
+            elif f_type is tk.BooleanVar:
+                setattr(self, field, self._booleanvar(getattr(config, field)))
 
         self._show()
 
@@ -44,6 +52,11 @@ class ConfigFrame():
         stringvar.trace_add('write', self._check_value_changed)
         return stringvar
 
+    def _booleanvar(self, value: bool) -> tk.BooleanVar:
+        booleanvar = tk.BooleanVar(value=value)
+        booleanvar.trace_add('write', self._check_value_changed)
+        return booleanvar
+
     def _show(self) -> None:
         # pylint: disable=no-member)
         root = self.root
@@ -98,6 +111,34 @@ class ConfigFrame():
         entry = ttk.Entry(frame, textvariable=self.windows_project_directory)
         entry.grid(row=row, column=1, sticky=tk.EW)
 
+        row += 1
+        label = ttk.Label(frame, text='Copy source as')
+        label.grid(row=row, column=0, sticky=tk.E, padx=PAD, pady=PAD)
+        combobox = ttk.Combobox(frame, textvariable=self.materialize_mode,
+                                values=MATERIALIZE_MODES, state='readonly')
+        combobox.grid(row=row, column=1, sticky=tk.W)
+
+        row += 1
+        label = ttk.Label(frame, text='Project store')
+        label.grid(row=row, column=0, sticky=tk.E, padx=PAD, pady=PAD)
+        combobox = ttk.Combobox(frame, textvariable=self.project_store,
+                                values=list(STORE_PATHS), state='readonly')
+        combobox.grid(row=row, column=1, sticky=tk.W)
+
+        row += 1
+        label = ttk.Label(frame, text='Build output')
+        label.grid(row=row, column=0, sticky=tk.E, padx=PAD, pady=PAD)
+        combobox = ttk.Combobox(frame, textvariable=self.output_sink,
+                                values=OUTPUT_SINKS, state='readonly')
+        combobox.grid(row=row, column=1, sticky=tk.W)
+
+        row += 1
+        # An archive is written without the directory unless this is set
+        check_button = tk.Checkbutton(
+            frame, text='Keep the build directory as well as the archive',
+            variable=self.keep_build_dir)
+        check_button.grid(row=row, column=1, sticky=tk.W)
+
         return frame
 
     def _button_frame(self, master: tk.Frame) -> tk.Frame:
@@ -122,8 +163,13 @@ class ConfigFrame():
         self.button_frame.enable(enable)
 
     def _save_config(self, *args) -> None:
+        config_changes = self._config_changes()
         changes = {field: f'(old value={change[0]}, new_value={change[1]})'
-                   for field, change in self._config_changes().items()}
+                   for field, change in config_changes.items()}
+
+        if 'project_store' in config_changes:
+            # Otherwise the projects are left behind in the old store
+            switch_project_store(*config_changes['project_store'])
 
         for field in FIELDS:
             self.config.config[field] = getattr(self, field).get()
@@ -7,17 +7,16 @@ from pathlib import Path
 from psiutils.constants import PAD, MODES
 from psiutils.buttons import ButtonFrame
 from psiutils.widgets import HAND
-from psiutils.utilities import window_resize
 from psiutils.menus import Menu, MenuItem
 
 
-from windows_converter.config import read_config
-from windows_converter.projects import ProjectServer
+from windows_converter.config import (
+    defer_update, flush_config, get_config, window_resize)
+from windows_converter.projects import get_project_server
 from windows_converter.constants import APP_TITLE
 from windows_converter.text import Text
 
 from windows_converter.main_menu import MainMenu
-from windows_converter.forms.frm_project import ProjectFrame
 
 txt = Text()
 FRAME_TITLE = APP_TITLE
@@ -27,10 +26,10 @@ class MainFrame():
     def __init__(self, root: tk.Tk) -> None:
         # pylint: disable=no-member)
         self.root = root
-        self.project_server = ProjectServer()
+        self.project_server = get_project_server()
         self.projects = self.project_server.projects
         self.project = None
-        self.config = read_config()
+        self.config = get_config()
         self.listbox = None
 
         # tk variables
@@ -125,8 +124,7 @@ class MainFrame():
             return
         names = sorted(list(self.projects))
         self._project_selected(names[selection[0]])
-        self.config.update('last_project', self.project.id)
-        self.config.save()
+        defer_update('last_project', self.project.id)
 
     def _project_selected(self, project_id: str) -> None:
         self.project = self.projects[project_id]
@@ -134,6 +132,7 @@ class MainFrame():
         self.context_menu.enable()
 
     def _new_project(self, *args) -> None:
+        from windows_converter.forms.frm_project import ProjectFrame
         dlg = ProjectFrame(self, MODES['new'])
         self.root.wait_window(dlg.root)
 
@@ -142,8 +141,26 @@ class MainFrame():
             self.project_list.set(sorted(list(self.projects)))
 
     def _build_project(self, *args) -> None:
+        from windows_converter.forms.frm_project import ProjectFrame
         dlg = ProjectFrame(self, MODES['edit'], self.project)
         self.root.wait_window(dlg.root)
 
+    def refresh_projects(self) -> None:
+        """Use the current project store, e.g. after the config changed it.
+
+        Project forms save through this server, so holding on to an old
+        one would save to the store that was switched away from.
+        """
+        project_server = get_project_server()
+        if project_server is self.project_server:
+            return
+        self.project_server = project_server
+        self.projects = project_server.projects
+        self.project = None
+        self.listbox.selection_clear(0, tk.END)
+        self.button_frame.disable()
+        self.project_list.set(sorted(list(self.projects)))
+
     def _dismiss(self, *args) -> None:
+        flush_config()
         self.root.destroy()
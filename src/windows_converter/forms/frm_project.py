@@ -1,5 +1,7 @@
 
 """ProjectFrame for Windows converter."""
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from pathlib import Path
@@ -8,16 +10,18 @@ import re
 from psiutils.constants import PAD, MODES
 from psiutils.buttons import ButtonFrame
 from psiutils.widgets import separator_frame, Tooltip
-from psiutils.utilities import window_resize
 
 from windows_converter.constants import APP_TITLE
-from windows_converter.config import read_config
-from windows_converter.projects import Project
+from windows_converter.config import get_config, window_resize
+from windows_converter.projects import BUILD_PROFILES, Project
+from windows_converter.progress import (
+    BuildCancelled, BuildProgress, ProgressReporter)
 from windows_converter.text import Text
 from windows_converter import logger
 
 txt = Text()
 FRAME_TITLE = f'{APP_TITLE} - MODE project'
+PROGRESS_POLL_MS = 100
 
 
 class ProjectFrame():
@@ -26,12 +30,13 @@ class ProjectFrame():
         # pylint: disable=no-member)
         self.root = tk.Toplevel(parent.root)
         self.parent = parent
-        self.config = read_config()
+        self.config = get_config()
         self.mode = mode
         self.project_server = parent.project_server
         if not project:
             project = Project()
             project.author = self.config.author
+        project.resolve_directories()
         self.project = project
         dev_dir_tooltip = f'e.g. /home/jeff/projects/{project.name}/src'
         source_dir_tooltip = (f'e.g. /home/jeff/projects/{project.name}'
@@ -70,8 +75,21 @@ class ProjectFrame():
             value=self.project.win_install_path)
         self.start_menu_text = tk.StringVar(value=self.project.start_menu_text)
         self.version = tk.StringVar(value=self.project.version)
+        self.build_profile = tk.StringVar(value=self.project.build_profile)
+        self.size_budget_mb = tk.StringVar(
+            value=self.project.size_budget_mb or '')
         self.update_requirements = tk.BooleanVar(value=False)
+        self.incremental_build = tk.BooleanVar(
+            value=self.config.incremental_build)
+        self.force_build = tk.BooleanVar(value=False)
         self.close_on_build = tk.BooleanVar(value=True)
+        self.build_status = tk.StringVar()
+
+        self.build_thread = None
+        # Button state before the build, restored when it finishes
+        self.buttons_enabled = False
+        self.build_queue = queue.Queue()
+        self.cancel_event = threading.Event()
 
         self.project_id.trace_add('write', self._project_name_changed)
         self.company_name.trace_add('write', self._company_name_changed)
@@ -142,12 +160,44 @@ class ProjectFrame():
                                       variable=self.update_requirements)
         check_button.grid(row=row, column=0, sticky=tk.W)
 
+        row += 1
+        # Only copy changed files
+        check_button = tk.Checkbutton(frame, text='Incremental build',
+                                      variable=self.incremental_build)
+        check_button.grid(row=row, column=0, sticky=tk.W)
+
+        row += 1
+        # Build even if nothing has changed
+        check_button = tk.Checkbutton(frame, text='Force build',
+                                      variable=self.force_build)
+        check_button.grid(row=row, column=0, sticky=tk.W)
+
         row += 1
         # Close after build
         check_button = tk.Checkbutton(frame, text='Close after build',
                                       variable=self.close_on_build)
         check_button.grid(row=row, column=0, sticky=tk.W)
 
+        row += 1
+        progress_frame = self._progress_frame(frame)
+        progress_frame.grid(row=row, column=0, sticky=tk.EW)
+
+        return frame
+
+    def _progress_frame(self, master: tk.Frame) -> ttk.Frame:
+        frame = ttk.Frame(master)
+        frame.columnconfigure(0, weight=1)
+
+        self.progress_bar = ttk.Progressbar(frame, mode='determinate')
+        self.progress_bar.grid(row=0, column=0, sticky=tk.EW, padx=PAD)
+
+        self.cancel_button = ttk.Button(
+            frame, text=txt.CANCEL, command=self._cancel_build,
+            state=tk.DISABLED)
+        self.cancel_button.grid(row=0, column=1, padx=PAD)
+
+        label = ttk.Label(frame, textvariable=self.build_status)
+        label.grid(row=1, column=0, columnspan=2, sticky=tk.W, padx=PAD)
         return frame
 
     def _project_frame(self, master: tk.Frame) -> ttk.Frame:
@@ -283,6 +333,21 @@ class ProjectFrame():
         entry = ttk.Entry(frame, textvariable=self.start_menu_text)
         entry.grid(row=row, column=1, sticky=tk.EW)
 
+        row += 1
+        # PyInstaller profile: dev (cached, onedir) or release (onefile)
+        label = ttk.Label(frame, text='Build profile')
+        label.grid(row=row, column=0, sticky=tk.E, padx=PAD, pady=PAD)
+        combobox = ttk.Combobox(frame, textvariable=self.build_profile,
+                                values=BUILD_PROFILES, state='readonly')
+        combobox.grid(row=row, column=1, sticky=tk.W)
+
+        row += 1
+        # Size budget: the build fails if the bundle is larger
+        label = ttk.Label(frame, text='Size budget (MB)')
+        label.grid(row=row, column=0, sticky=tk.E, padx=PAD, pady=PAD)
+        entry = ttk.Entry(frame, textvariable=self.size_budget_mb, width=8)
+        entry.grid(row=row, column=1, sticky=tk.W)
+
         return frame
 
     def _button_frame(self, master: tk.Frame) -> tk.Frame:
@@ -392,8 +457,7 @@ class ProjectFrame():
         if self.mode == MODES['new']:
             self.project = Project()
         self._update_project()
-        self.project_server.projects[self.project.name] = self.project
-        self.project_server.save_projects()
+        self.project_server.save_project(self.project)
 
     def _check_spaces_in_name(self) -> bool:
         if ' ' not in self.project_id.get():
@@ -407,23 +471,121 @@ class ProjectFrame():
         return bool(dlg)
 
     def _build(self, *args) -> None:
+        if self.build_thread:
+            return
         if not self._check_spaces_in_name():
             return
 
-        config = read_config()
+        config = get_config()
         self._update_project()
-        result = self.project.build(config, self.update_requirements.get())
-        if result == self.project.status_ok:
-            messagebox.showinfo(
-                '',
-                'Build_complete'
-            )
+        if not self._check_problems():
+            return
+        self.cancel_event.clear()
+        reporter = ProgressReporter(
+            lambda progress: self.build_queue.put(('progress', progress)),
+            self.cancel_event)
+
+        # Build off the Tk event loop; results come back via build_queue
+        self.build_thread = threading.Thread(
+            target=self._run_build,
+            args=(config,
+                  self.update_requirements.get(),
+                  self.incremental_build.get(),
+                  self.force_build.get(),
+                  reporter),
+            daemon=True)
+        self.buttons_enabled = self.button_frame.enabled
+        self.button_frame.disable()
+        self.cancel_button['state'] = tk.NORMAL
+        self.progress_bar['value'] = 0
+        self.build_status.set('Building...')
+        self.build_thread.start()
+        self.root.after(PROGRESS_POLL_MS, self._poll_build)
+
+    def _check_problems(self) -> bool:
+        problems = self.project.problems()
+        if not problems:
+            return True
+        dlg = messagebox.askyesno(
+            '',
+            '\n'.join(problems + ['', 'Build anyway?']),
+            parent=self.root,
+        )
+        return bool(dlg)
+
+    def _run_build(
+            self,
+            config,
+            update_requirements: bool,
+            incremental: bool,
+            force: bool,
+            reporter: ProgressReporter) -> None:
+        try:
+            result = self.project.build(
+                config,
+                update_requirements,
+                incremental=incremental,
+                reporter=reporter,
+                force=force)
+            self.build_queue.put(('done', result))
+        except BuildCancelled:
+            self.build_queue.put(('cancelled', None))
+        except Exception as err:
+            logger.exception('Build failed')
+            self.build_queue.put(('error', err))
+
+    def _poll_build(self) -> None:
+        if not self.root.winfo_exists():
+            return
+        while True:
+            try:
+                event, value = self.build_queue.get_nowait()
+            except queue.Empty:
+                break
+            if event == 'progress':
+                self._show_progress(value)
+            else:
+                self._build_finished(event, value)
+                return
+        self.root.after(PROGRESS_POLL_MS, self._poll_build)
+
+    def _show_progress(self, progress: BuildProgress) -> None:
+        self.progress_bar['maximum'] = max(progress.files_planned, 1)
+        self.progress_bar['value'] = progress.files
+        megabytes = progress.bytes / 1_000_000
+        self.build_status.set(
+            f'{progress.stage}: {progress.files} files, {megabytes:.1f} MB')
+
+    def _cancel_build(self, *args) -> None:
+        self.cancel_event.set()
+        self.cancel_button['state'] = tk.DISABLED
+        self.build_status.set('Cancelling...')
+
+    def _build_finished(self, event: str, result: object) -> None:
+        self.build_thread = None
+        self.cancel_button['state'] = tk.DISABLED
+        self.button_frame.enable(self.buttons_enabled)
+
+        if event == 'cancelled':
+            self.build_status.set('Build cancelled')
+        elif event == 'done' and result.up_to_date:
+            self.build_status.set(
+                'Up to date: nothing has changed since the last build')
+        elif event == 'done' and result.status == self.project.status_ok:
+            self.build_status.set(
+                f'Build complete in {result.duration:.1f} s')
+            from windows_converter.forms.frm_build_report import (
+                BuildReportFrame)
+            dlg = BuildReportFrame(self, result)
+            self.root.wait_window(dlg.root)
             if self.close_on_build.get():
                 self._dismiss()
         else:
+            self.build_status.set('Build failed')
             messagebox.showerror(
                 '',
-                'Build failed!'
+                'Build failed!',
+                parent=self.root,
             )
 
     def _update_project(self) -> None:
@@ -454,6 +616,13 @@ class ProjectFrame():
         self.project.exe_name = self.exe_name.get()
         self.project.company_name = self.company_name.get()
         self.project.start_menu_text = self.start_menu_text.get()
+        self.project.build_profile = self.build_profile.get()
+        try:
+            self.project.size_budget_mb = float(self.size_budget_mb.get())
+        except ValueError:
+            self.project.size_budget_mb = 0
 
     def _dismiss(self, *args) -> None:
+        # A running build stops at its next file or stage
+        self.cancel_event.set()
         self.root.destroy()
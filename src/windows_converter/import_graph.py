@@ -0,0 +1,186 @@
+"""Import graph of a project's source for Windows converter."""
+import ast
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from windows_converter.constants import USER_DATA_DIR
+from windows_converter import logger
+
+CACHE_DIR = Path(USER_DATA_DIR, 'imports')
+
+# Below this many files to parse, a process pool costs more than it saves
+POOL_THRESHOLD = 16
+# The pool starts while build and Tk threads run; a forked child could
+# inherit a lock (e.g. logging's) that one of them holds
+POOL_START_METHOD = 'spawn'
+
+DYNAMIC_IMPORTERS = ('importlib.import_module', 'import_module', '__import__')
+
+# Modules PyInstaller misses when the key (or a submodule of it) is used
+COMPANION_IMPORTS = {
+    'tkinter': ('tkinter',),
+    'tkinterweb': ('tkinterweb',),
+    'PIL.ImageTk': ('PIL._tkinter_finder',),
+    # psiutils' widgets are built on tkinter and PIL.ImageTk
+    'psiutils': ('tkinter', 'PIL._tkinter_finder'),
+}
+
+
+def import_graph(
+        source_dir: str,
+        cache_name: str = '',
+        workers: int = 0,
+        cache_dir: Path = CACHE_DIR,
+        ) -> dict[str, dict[str, list[str]]]:
+    """Return the imports of each module under source_dir.
+
+    Each module maps to {'static': [...], 'dynamic': [...]}, where
+    dynamic lists the string literals passed to importlib.import_module
+    or __import__. Modules are named from source_dir's parent, so
+    source_dir is the package. Files are parsed in a process pool and
+    the result for each is cached by its content hash in cache_dir,
+    under cache_name.
+    """
+    source_dir = Path(source_dir)
+    files = {}
+    for directory_name, subdir_list, file_list in os.walk(source_dir):
+        subdir_list[:] = [name for name in subdir_list
+                          if name != '__pycache__']
+        for file_name in file_list:
+            if file_name.endswith('.py'):
+                path = Path(directory_name, file_name)
+                files[_module_name(path, source_dir.parent)] = path
+
+    cache_path = Path(cache_dir, f'{cache_name}.json') if cache_name else None
+    cache = _read_cache(cache_path)
+    digests = {module: hashlib.sha256(path.read_bytes()).hexdigest()
+               for module, path in files.items()}
+    missing = sorted({digest for digest in digests.values()
+                      if digest not in cache})
+    sources = {digests[module]: files[module] for module in files}
+
+    if missing:
+        paths = [str(sources[digest]) for digest in missing]
+        if len(paths) >= POOL_THRESHOLD:
+            context = multiprocessing.get_context(POOL_START_METHOD)
+            with ProcessPoolExecutor(max_workers=workers or None,
+                                     mp_context=context) as pool:
+                parsed = list(pool.map(parse_imports, paths, chunksize=8))
+        else:
+            parsed = [parse_imports(path) for path in paths]
+        cache.update(zip(missing, parsed))
+
+    graph = {}
+    for module, digest in digests.items():
+        imports = cache[digest]
+        graph[module] = {
+            'static': _resolve(imports['static'], module, files[module]),
+            'dynamic': _resolve(imports['dynamic'], module, files[module]),
+        }
+
+    if cache_path:
+        _save_cache(cache_path, {digest: cache[digest]
+                                 for digest in set(digests.values())})
+    logger.info('Import graph', modules=len(graph), parsed=len(missing))
+    return graph
+
+
+def hidden_imports(graph: dict[str, dict[str, list[str]]]) -> list[str]:
+    """Return the modules PyInstaller cannot find by following imports.
+
+    These are the dynamic imports, including the project's own modules,
+    and the companions in COMPANION_IMPORTS of anything imported.
+    """
+    hidden = set()
+    for imports in graph.values():
+        hidden.update(imports['dynamic'])
+        for name in imports['static'] + imports['dynamic']:
+            for trigger, companions in COMPANION_IMPORTS.items():
+                if name == trigger or name.startswith(f'{trigger}.'):
+                    hidden.update(companions)
+    return sorted(hidden)
+
+
+def parse_imports(path: str) -> dict[str, list]:
+    """Return the static and dynamic imports in the file at path.
+
+    Relative imports are kept as (level, name) pairs, to be resolved
+    against the module's name later.
+    """
+    try:
+        with open(path, 'rb') as f_source:
+            tree = ast.parse(f_source.read(), filename=path)
+    except (SyntaxError, ValueError) as err:
+        logger.warning(f'{path} not parsed', Exception=f'{err}')
+        return {'static': [], 'dynamic': []}
+
+    static = []
+    dynamic = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            static.extend([0, alias.name] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ''
+            static.append([node.level, base])
+            static.extend(
+                [node.level, f'{base}.{alias.name}' if base else alias.name]
+                for alias in node.names if alias.name != '*')
+        elif isinstance(node, ast.Call):
+            target = _dynamic_target(node)
+            if target:
+                dynamic.append(target)
+    return {'static': static, 'dynamic': dynamic}
+
+
+def _dynamic_target(node: ast.Call) -> list | None:
+    if ast.unparse(node.func) not in DYNAMIC_IMPORTERS or not node.args:
+        return None
+    name = node.args[0]
+    if not (isinstance(name, ast.Constant) and isinstance(name.value, str)):
+        return None
+    level = len(name.value) - len(name.value.lstrip('.'))
+    return [level, name.value[level:]]
+
+
+def _resolve(imports: list, module: str, path: Path) -> list[str]:
+    # A package's __init__ is the package itself, so level 1 is module
+    package = module.split('.')
+    if path.name != '__init__.py':
+        package = package[:-1]
+    names = set()
+    for level, name in imports:
+        if level:
+            if level > len(package):
+                continue
+            base = package[:len(package) - level + 1]
+            name = '.'.join(base + [name] if name else base)
+        if name:
+            names.add(name)
+    return sorted(names)
+
+
+def _module_name(path: Path, root: Path) -> str:
+    parts = list(path.relative_to(root).with_suffix('').parts)
+    if parts[-1] == '__init__':
+        parts.pop()
+    return '.'.join(parts)
+
+
+def _read_cache(cache_path: Path | None) -> dict:
+    if cache_path is None:
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f_cache:
+            return json.load(f_cache)
+    except (FileNotFoundError, json.decoder.JSONDecodeError):
+        return {}
+
+
+def _save_cache(cache_path: Path, cache: dict) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as f_cache:
+        json.dump(cache, f_cache)
@@ -1,18 +1,38 @@
 """Main module for Windows converter."""
+import builtins
 from pathlib import Path
 
-from psiutils.icecream_init import ic_init
-
-from windows_converter.modules import check_imports
+from windows_converter.config import get_config
 from windows_converter.root import Root
 
-ic_init()
-
 
 def main():
-    check_imports('windows_converter', Path(__file__).parent)
+    _install_ic()
+    if get_config().check_imports:
+        from windows_converter.modules import check_imports
+        check_imports('windows_converter', Path(__file__).parent)
     Root()
 
 
+def _install_ic() -> None:
+    # icecream is only imported by the first ic() call
+    def ic(*args):
+        from psiutils.icecream_init import ic_init
+        ic_init()
+        if builtins.ic is ic:
+            # icecream is not installed
+            builtins.ic = _no_ic
+        return builtins.ic(*args)
+
+    if not hasattr(builtins, 'ic'):
+        builtins.ic = ic
+
+
+def _no_ic(*args):
+    if not args:
+        return None
+    return args[0] if len(args) == 1 else args
+
+
 if __name__ == '__main__':
     main()
@@ -7,9 +7,7 @@ from psiutils.menus import Menu, MenuItem
 from windows_converter.constants import AUTHOR, APP_TITLE, HELP_URI
 from windows_converter._version import __version__
 from windows_converter.text import Text
-from windows_converter.config import config
-
-from windows_converter.forms.frm_config import ConfigFrame
+from windows_converter.config import get_config
 
 txt = Text()
 SPACES = ' '*20
@@ -41,8 +39,11 @@ class MainMenu():
 
     def _show_config_frame(self):
         """Display the config frame."""
+        from windows_converter.forms.frm_config import ConfigFrame
         dlg = ConfigFrame(self)
         self.root.wait_window(dlg.root)
+        # The project store may have been switched
+        self.parent.refresh_projects()
 
     def _help_menu_items(self) -> list:
         # pylint: disable=no-member)
@@ -58,7 +59,7 @@ class MainMenu():
 
     def _show_data_directory(self):
         # pylint: disable=no-member)
-        data_dir = f'Data directory: {config.data_directory} {SPACES}'
+        data_dir = f'Data directory: {get_config().data_directory} {SPACES}'
         messagebox.showinfo(title='Data directory', message=data_dir)
 
     def _show_about(self):
@@ -0,0 +1,76 @@
+"""Build stage metrics for Windows converter."""
+import contextvars
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from windows_converter import logger
+
+_current_stage = contextvars.ContextVar('current_stage', default=None)
+# Guards every StageMetrics' counts; a lock in each would stop a
+# BuildReport being pickled back from a worker process
+_count_lock = threading.Lock()
+
+
+@dataclass
+class StageMetrics:
+    """Wall time, output and memory of one build stage.
+
+    peak_memory is the peak resident size of the whole process (bytes)
+    when the stage finished; stages run concurrently, so it is an upper
+    bound for the stage rather than its own usage.
+    """
+    name: str
+    duration: float = 0.0
+    files: int = 0
+    bytes: int = 0
+    peak_memory: int = 0
+
+
+@contextmanager
+def measure(name: str):
+    """Record the metrics of the stage run inside this context."""
+    metrics = StageMetrics(name)
+    token = _current_stage.set(metrics)
+    start_time = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        metrics.duration = time.perf_counter() - start_time
+        metrics.peak_memory = peak_memory()
+        _current_stage.reset(token)
+        logger.info(
+            'Stage finished',
+            stage=name,
+            duration=round(metrics.duration, 3),
+            files=metrics.files,
+            bytes=metrics.bytes,
+            peak_memory=metrics.peak_memory)
+
+
+def count(files: int = 1, size: int = 0) -> None:
+    """Add files and bytes processed to the current stage, if any."""
+    metrics = _current_stage.get()
+    if metrics is None:
+        return
+    with _count_lock:
+        metrics.files += files
+        metrics.bytes += size
+
+
+def peak_memory() -> int:
+    """Return the peak resident set size of the process in bytes."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return peak
+    return peak * 1024
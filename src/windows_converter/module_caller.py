@@ -1,13 +1,6 @@
 import sys
 
-from psiutils.constants import MODES
-from psiutils.utilities import notify
-
-from windows_converter.config import read_config
-from windows_converter.projects import ProjectServer
-
-from windows_converter.forms.frm_config import ConfigFrame
-from windows_converter.forms.frm_project import ProjectFrame
+from windows_converter.config import get_config
 
 class ModuleCaller():
     def __init__(self, root, module) -> None:
@@ -37,13 +30,20 @@ class ModuleCaller():
         return
 
     def _config(self) -> None:
+        from windows_converter.forms.frm_config import ConfigFrame
         dlg = ConfigFrame(self)
         self.root.wait_window(dlg.root)
 
     def _project(self) -> None:
-        self.config = read_config()
-        self.project_server = ProjectServer()
-        projects = self.project_server.read_projects()
+        from psiutils.constants import MODES
+        from psiutils.utilities import notify
+
+        from windows_converter.projects import get_project_server
+        from windows_converter.forms.frm_project import ProjectFrame
+
+        self.config = get_config()
+        self.project_server = get_project_server()
+        projects = self.project_server.projects
         item = 0
         if len(sys.argv) > 2:
             item = sys.argv[2]
@@ -1,10 +1,14 @@
 
+import json
 import os
 from pathlib import Path
 import re
 
+from windows_converter.constants import USER_DATA_DIR
 from windows_converter import logger
 
+CACHE_FILE = Path(USER_DATA_DIR, 'import_check.json')
+
 TEST_DIR = Path(
     Path.home(),
     'projects',
@@ -18,15 +22,47 @@ IMPORTS = (
     'psiutils',
 )
 
-def check_imports(package: str, source_dir: str) -> None:
+def check_imports(
+        package: str,
+        source_dir: str,
+        cache_file: Path | None = CACHE_FILE) -> None:
+    """Warn about imports of the package's modules without the package.
+
+    The result for each file is cached in cache_file by its mtime and
+    size, so only files changed since the last check are read again.
+    """
     if not Path(source_dir).is_dir():
         logger.error(f'{source_dir} is not a directory')
         return
 
     modules = _get_modules(source_dir)
+    if not modules:
+        return
+    module_re = re.compile(
+        r'\b(' + '|'.join(map(re.escape, sorted(modules))) + r')\b')
+    cache = _read_cache(cache_file, sorted(modules))
+    files = {}
     for path in modules.values():
-        text = _get_text(path)
-        _check_imports(list(modules), package, source_dir, path.stem, text)
+        stat = path.stat()
+        key = str(path)
+        cached = cache['files'].get(key)
+        if cached and cached['stamp'] == [stat.st_mtime_ns, stat.st_size]:
+            problems = cached['problems']
+        else:
+            problems = _check_imports(module_re, package, _get_text(path))
+        files[key] = {
+            'stamp': [stat.st_mtime_ns, stat.st_size],
+            'problems': problems,
+        }
+        for module, line, line_number in problems:
+            print(path.stem, module, line)
+            logger.warning(
+                (f'Missing package definition in '
+                 f'{source_dir}/{path.stem}: {line_number}'))
+
+    if files != cache['files']:
+        cache['files'] = files
+        _save_cache(cache_file, cache)
 
 
 def _get_modules(module_dir: str) -> dict:
@@ -46,27 +82,45 @@ def _get_text(path: str) -> list:
 
 
 def _check_imports(
-        modules: list,
+        module_re: re.Pattern,
         package: str,
-        source_dir: str,
-        module_name: str,
-        text: list) -> None:
+        text: list) -> list[list]:
+    problems = []
     for index, line in enumerate(text):
         import_line = any(line.startswith(start) for start in STARTS_WITH)
         if not import_line:
             continue
 
         imported_package = (line.split()[1]).split('.')[0]
-        if imported_package in IMPORTS:
+        if imported_package in IMPORTS or f'{package}.' in line:
             continue
 
-        for module in modules:
-            module_re = rf'\b{module}\b'
-            if re.search(module_re, line) and f'{package}.' not in line:
-                print(module_name, module, line)
-                logger.warning(
-                    (f'Missing package definition in '
-                     f'{source_dir}/{module_name}: {index+1}'))
+        for module in dict.fromkeys(module_re.findall(line)):
+            problems.append([module, line, index + 1])
+    return problems
+
+
+def _read_cache(cache_file: Path | None, modules: list) -> dict:
+    # A new or renamed module can change the result for any file
+    empty = {'modules': modules, 'files': {}}
+    if cache_file is None:
+        return empty
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f_cache:
+            cache = json.load(f_cache)
+    except (FileNotFoundError, json.decoder.JSONDecodeError):
+        return empty
+    if cache.get('modules') != modules:
+        return empty
+    return cache
+
+
+def _save_cache(cache_file: Path | None, cache: dict) -> None:
+    if cache_file is None:
+        return
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_file, 'w', encoding='utf-8') as f_cache:
+        json.dump(cache, f_cache)
 
 
 if __name__ == "__main__":
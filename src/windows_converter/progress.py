@@ -0,0 +1,72 @@
+"""Build progress reporting and cancellation for Windows converter."""
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+
+STAGE_STARTED = 'started'
+STAGE_FINISHED = 'finished'
+FILE_COPIED = 'copied'
+
+
+class BuildCancelled(Exception):
+    """Raised inside a build once it has been cancelled."""
+
+
+@dataclass
+class BuildProgress:
+    stage: str
+    state: str
+    files: int = 0
+    bytes: int = 0
+    files_planned: int = 0
+
+
+class ProgressReporter():
+    """Collect progress from the build's worker threads.
+
+    Every event is passed to callback as a BuildProgress, from whichever
+    thread produced it. Setting cancel_event makes the next check()
+    raise BuildCancelled.
+    """
+    def __init__(
+            self,
+            callback: Callable[[BuildProgress], None] | None = None,
+            cancel_event: threading.Event | None = None,
+            ) -> None:
+        self.callback = callback
+        self.cancel_event = cancel_event or threading.Event()
+        self.files = 0
+        self.bytes = 0
+        self.files_planned = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise BuildCancelled()
+
+    def stage(self, name: str, finished: bool = False) -> None:
+        if not finished:
+            self.check()
+        self._emit(name, STAGE_FINISHED if finished else STAGE_STARTED)
+
+    def planned(self, files: int) -> None:
+        with self._lock:
+            self.files_planned += files
+
+    def copied(self, stage: str, size: int) -> None:
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+        self._emit(stage, FILE_COPIED)
+
+    def _emit(self, stage: str, state: str) -> None:
+        if self.callback:
+            self.callback(BuildProgress(
+                stage, state, self.files, self.bytes, self.files_planned))
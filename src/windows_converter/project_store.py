@@ -0,0 +1,339 @@
+"""Project storage backends for Windows converter."""
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from windows_converter import logger
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+JOURNAL_SUFFIX = '.jsonl'
+COMPACT_THRESHOLD = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS projects_name ON projects (name);
+"""
+
+
+class JsonProjectStore():
+    """All projects in one JSON object keyed by project id."""
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+
+    def read_all(self) -> dict[str, dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f_projects:
+                return json.load(f_projects)
+        except FileNotFoundError:
+            logger.error(f'{self.path} FileNotFoundError')
+        except IsADirectoryError:
+            logger.error(f'{self.path} IsADirectoryError')
+        except json.decoder.JSONDecodeError:
+            logger.error(f'{self.path} JSONDecodeError')
+        return {}
+
+    def signature(self) -> tuple:
+        return _stat_signature(self.path)
+
+    def ids(self) -> list[str]:
+        return list(self.read_all())
+
+    def read(self, project_id: str) -> dict | None:
+        return self.read_all().get(project_id)
+
+    def save(self, project_id: str, data: dict) -> None:
+        projects = self.read_all() if self.path.exists() else {}
+        projects[project_id] = data
+        self.save_all(projects)
+
+    def save_all(self, projects: dict[str, dict]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f_projects:
+            json.dump(projects, f_projects)
+            f_projects.flush()
+            os.fsync(f_projects.fileno())
+        os.replace(temp_path, self.path)
+        # The rename itself is only durable once the directory is synced
+        _fsync_directory(self.path.parent)
+
+
+class SqliteProjectStore():
+    """One row per project; saving a project upserts only its row.
+
+    If the database does not exist yet it is created and, when given,
+    the projects in json_path are imported into it.
+    """
+    def __init__(self, path: Path, json_path: Path | None = None) -> None:
+        self.path = Path(path)
+        migrate = not self.path.exists()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript(SCHEMA)
+        if migrate and json_path and Path(json_path).is_file():
+            self._migrate(Path(json_path))
+
+    def read_all(self) -> dict[str, dict]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                'SELECT id, data FROM projects ORDER BY name').fetchall()
+        return {project_id: json.loads(data) for project_id, data in rows}
+
+    def signature(self) -> tuple:
+        # Committed writes may sit in the write-ahead log until checkpoint
+        return (_stat_signature(self.path)
+                + _stat_signature(Path(f'{self.path}-wal')))
+
+    def ids(self) -> list[str]:
+        with self._connect() as connection:
+            rows = connection.execute('SELECT id FROM projects').fetchall()
+        return [row[0] for row in rows]
+
+    def read(self, project_id: str) -> dict | None:
+        with self._connect() as connection:
+            row = connection.execute(
+                'SELECT data FROM projects WHERE id = ?',
+                (project_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, project_id: str, data: dict) -> None:
+        self.save_all({project_id: data})
+
+    def save_all(self, projects: dict[str, dict]) -> None:
+        rows = [(project_id, data.get('name', ''), json.dumps(data))
+                for project_id, data in projects.items()]
+        with self._connect() as connection:
+            connection.executemany(
+                'INSERT INTO projects (id, name, data) VALUES (?, ?, ?) '
+                'ON CONFLICT(id) DO UPDATE SET '
+                'name = excluded.name, data = excluded.data',
+                rows)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # The connection's context manager commits or rolls back
+        connection = sqlite3.connect(self.path)
+        try:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _migrate(self, json_path: Path) -> None:
+        projects = JsonProjectStore(json_path).read_all()
+        self.save_all(projects)
+        logger.info(
+            'Projects migrated',
+            source=str(json_path),
+            target=str(self.path),
+            projects=len(projects))
+
+
+class JournalProjectStore():
+    """A JSON snapshot plus an append-only journal of project saves.
+
+    Each save appends one fsynced line to the journal at path; the
+    snapshot is path with a .json suffix, so an existing projects file
+    is used as is. Reads replay the journal over the snapshot. Once the
+    journal holds compact_threshold records, the snapshot is rewritten
+    and the journal emptied on a background thread.
+    """
+    def __init__(
+            self,
+            path: Path,
+            compact_threshold: int = COMPACT_THRESHOLD) -> None:
+        self.path = Path(path)
+        self.snapshot = JsonProjectStore(self.path.with_suffix('.json'))
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        # One compaction at a time; saves only wait for self._lock
+        self._compact_lock = threading.Lock()
+        self._projects: dict[str, dict] = {}
+        self._records = 0
+        # Bytes of the journal up to the end of its last complete record
+        self._journal_size = 0
+        self._loaded_signature = None
+        self._torn = False
+        self._compactor: threading.Thread | None = None
+
+    def signature(self) -> tuple:
+        return (_stat_signature(self.snapshot.path)
+                + _stat_signature(self.path))
+
+    def read_all(self) -> dict[str, dict]:
+        with self._lock:
+            self._load()
+            return dict(self._projects)
+
+    def ids(self) -> list[str]:
+        return list(self.read_all())
+
+    def read(self, project_id: str) -> dict | None:
+        with self._lock:
+            self._load()
+            return self._projects.get(project_id)
+
+    def save(self, project_id: str, data: dict) -> None:
+        with self._lock:
+            self._append({project_id: data})
+            if (self._records >= self.compact_threshold
+                    and not self._compacting()):
+                self._compactor = threading.Thread(
+                    target=self.compact, name='compact-projects')
+                self._compactor.start()
+
+    def save_all(self, projects: dict[str, dict]) -> None:
+        with self._lock:
+            self._append(projects)
+        self.compact()
+
+    def compact(self) -> None:
+        """Write the current projects to the snapshot, emptying the journal.
+
+        Saves carry on while the snapshot is written. Only then are the
+        journal records it holds dropped, and the snapshot is on disk
+        first, so a crash at any point loses no save.
+        """
+        with self._compact_lock:
+            with self._lock:
+                self._load()
+                projects = dict(self._projects)
+                covered = self._journal_size
+            self.snapshot.save_all(projects)
+
+            with self._lock:
+                self._load()
+                # Records saved while the snapshot was written
+                tail = b''
+                if self._journal_size > covered:
+                    with open(self.path, 'rb') as f_journal:
+                        f_journal.seek(covered)
+                        tail = f_journal.read(self._journal_size - covered)
+                temp_path = Path(f'{self.path}.tmp')
+                with open(temp_path, 'wb') as f_journal:
+                    f_journal.write(tail)
+                    f_journal.flush()
+                    os.fsync(f_journal.fileno())
+                os.replace(temp_path, self.path)
+                _fsync_directory(self.path.parent)
+                self._records = tail.count(b'\n')
+                self._journal_size = len(tail)
+                self._torn = False
+                self._loaded_signature = self.signature()
+        logger.info('Project journal compacted', projects=len(projects))
+
+    def wait(self) -> None:
+        """Wait for a background compaction to finish."""
+        compactor = self._compactor
+        if compactor:
+            compactor.join()
+
+    def _compacting(self) -> bool:
+        return bool(self._compactor and self._compactor.is_alive())
+
+    def _append(self, projects: dict[str, dict]) -> None:
+        # Called with self._lock held
+        data = ''.join(
+            json.dumps({'id': project_id, 'data': project},
+                       separators=(',', ':')) + '\n'
+            for project_id, project in projects.items()).encode('utf-8')
+        self._load()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'ab') as f_journal:
+            if self._torn:
+                # Saves must not follow a record cut short by a crash
+                f_journal.truncate(self._journal_size)
+                self._torn = False
+            f_journal.write(data)
+            f_journal.flush()
+            os.fsync(f_journal.fileno())
+        self._projects.update(projects)
+        self._records += len(projects)
+        self._journal_size += len(data)
+        self._loaded_signature = self.signature()
+
+    def _load(self) -> None:
+        signature = self.signature()
+        if signature == self._loaded_signature:
+            return
+        projects = (self.snapshot.read_all()
+                    if self.snapshot.path.exists() else {})
+        records = 0
+        journal_size = 0
+        torn = False
+        try:
+            with open(self.path, 'rb') as f_journal:
+                for line in f_journal:
+                    try:
+                        record = json.loads(line)
+                    except json.decoder.JSONDecodeError:
+                        record = None
+                    if record is None or not line.endswith(b'\n'):
+                        # A save cut short by a crash; nothing follows it
+                        logger.warning(f'{self.path} torn record ignored')
+                        torn = True
+                        break
+                    projects[record['id']] = record['data']
+                    records += 1
+                    journal_size += len(line)
+        except FileNotFoundError:
+            pass
+        self._projects = projects
+        self._records = records
+        self._journal_size = journal_size
+        self._torn = torn
+        self._loaded_signature = signature
+
+
+def project_store(path: Path, json_path: Path | None = None):
+    """Return the store for path, chosen by its suffix."""
+    if Path(path).suffix in SQLITE_SUFFIXES:
+        return SqliteProjectStore(path, json_path)
+    if Path(path).suffix == JOURNAL_SUFFIX:
+        return JournalProjectStore(path)
+    return JsonProjectStore(path)
+
+
+def migrate_projects(source_path: Path, target_path: Path) -> int:
+    """Copy the projects in the store at source_path to target_path.
+
+    Projects already in the target store with the same id are replaced.
+    Return the number of projects copied.
+    """
+    projects = project_store(source_path).read_all()
+    project_store(target_path).save_all(projects)
+    logger.info(
+        'Projects migrated',
+        source=str(source_path),
+        target=str(target_path),
+        projects=len(projects))
+    return len(projects)
+
+
+def _fsync_directory(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # Windows cannot open a directory to sync it
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _stat_signature(path: Path) -> tuple:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return (None, None)
+    return (stat.st_mtime_ns, stat.st_size)
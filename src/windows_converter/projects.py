@@ -1,16 +1,54 @@
 """Project classes for Windows converter."""
 
-import contextlib
-from tkinter import messagebox
-import json
+from collections import deque
+from collections.abc import Iterator, MutableMapping
 import os
-import shutil
+import threading
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from windows_converter.constants import PROJECT_FILE, USER_DATA_DIR
-from windows_converter.config import TomlConfig
-from windows_converter.build import build_project
-from windows_converter import logger
+from windows_converter.constants import (
+    PROJECT_DB, PROJECT_FILE, PROJECT_JOURNAL)
+from windows_converter.config import TomlConfig, get_config
+from windows_converter.progress import ProgressReporter
+from windows_converter.project_store import migrate_projects, project_store
+
+if TYPE_CHECKING:
+    from windows_converter.build import BuildReport
+
+# Project attributes found by searching dev_base_dir for these names
+DIRECTORY_NAMES = {
+    'dev_source_dir': ('src', 'source'),
+    'dev_image_dir': ('images',),
+    'tests_directory': ('tests',),
+}
+
+# Directories that never contain the project's own source, images or tests
+PRUNED_DIRECTORIES = {
+    '.git', '.hg', '.svn', '.venv', 'venv', 'env', 'node_modules',
+    '__pycache__', '.mypy_cache', '.pytest_cache', '.ruff_cache', '.tox',
+    '.nox', '.eggs', '.idea', '.vscode', 'build', 'dist', 'site-packages',
+}
+
+# PyInstaller profiles in the generated build_exe.py
+BUILD_PROFILES = ('dev', 'release', 'onedir')
+DEFAULT_BUILD_PROFILE = 'release'
+# Profiles that build a folder, dist/<exe_name>, rather than one exe
+ONEDIR_PROFILES = ('dev', 'onedir')
+
+# The generated build_exe.py and installer need both icons
+ICON_FILES = ('icon.ico', 'icon.png')
+
+_directory_cache = {}
+
+STORE_PATHS = {
+    'sqlite': PROJECT_DB,
+    'journal': PROJECT_JOURNAL,
+    'json': PROJECT_FILE,
+}
+
+_servers: dict[str, 'ProjectServer'] = {}
+_servers_lock = threading.Lock()
 
 
 class Project():
@@ -35,14 +73,14 @@ class Project():
         self.company_name = ''
         self.exe_name = ''
         self.version = '0.0.0'
+        self.build_profile = DEFAULT_BUILD_PROFILE
+        # The build fails if the bundle is larger (MB); 0 is no budget
+        self.size_budget_mb = 0
         self.status_ok = 1
 
         if data and isinstance(data, dict):
             self._assign_attributes(data)
 
-        if self.dev_base_dir:
-            self._get_directories()
-
     def _assign_attributes(self, data: dict) -> None:
         for key, item in data.items():
             setattr(self, key, item)
@@ -60,32 +98,22 @@ class Project():
     def __repr__(self):
         return f'Project: {self.name}'
 
-    def _get_directories(self) -> None:
-        if not self.dev_source_dir:
-            self._get_src_directory()
-        if not self.dev_image_dir:
-            self._get_image_directory()
-        if not self.tests_directory:
-            self._get_tests_directory()
-
-    def _get_src_directory(self) -> None:
-        names = ['src', 'source']
-        self.dev_source_dir = self._get_dir(names)
-
-    def _get_image_directory(self) -> None:
-        names = ['images']
-        self.dev_image_dir = self._get_dir(names)
-
-    def _get_tests_directory(self) -> None:
-        names = ['tests']
-        self.tests_directory = self._get_dir(names)
-
-    def _get_dir(self, names: list[str]) -> str:
-        for directory_name, subdir_list, _ in os.walk(
-                self.dev_base_dir):
-            for subdir_name in subdir_list:
-                if subdir_name in names:
-                    return str(Path(directory_name, subdir_name))
+    def resolve_directories(self) -> None:
+        """Fill in any unset source, image and tests directories.
+
+        This searches dev_base_dir, so it is left until the project is
+        opened or built.
+        """
+        if not self.dev_base_dir:
+            return
+        missing = [attribute for attribute in DIRECTORY_NAMES
+                   if not getattr(self, attribute)]
+        if not missing:
+            return
+
+        found = _find_directories(self.dev_base_dir)
+        for attribute in missing:
+            setattr(self, attribute, found.get(attribute))
 
     def _name_upper(self, delimiter: str = '') -> str:
         words = self.name.split('_')
@@ -97,69 +125,201 @@ class Project():
             config: TomlConfig,
             update_requirements: bool = False,
             testing: bool = False,
-            ) -> int:
+            incremental: bool = False,
+            reporter: ProgressReporter | None = None,
+            force: bool = False,
+            ) -> 'BuildReport':
+        # The build machinery is only needed once a build starts
+        from windows_converter.build import build_project
 
         return build_project(
             self,
             config,
             update_requirements,
-            testing,)
-
-    def _validate_icons(self, src_dir: Path, testing: bool) -> None:
-        dirs = [dir.name for dir in Path(self.dev_source_dir).iterdir()
-                if dir.is_dir()]
-        if 'images' in dirs and not testing:
-            dlg = messagebox.askyesno(
-                '',
-                'images is a directory in src. Copy?'
-            )
-            if not dlg:
-                shutil.rmtree(Path(src_dir, 'images'))
-        if testing and Path(src_dir, 'images').is_dir():
-            shutil.rmtree(Path(src_dir, 'images'))
-
-        images_dir = Path(Path(self.dev_source_dir), 'images')
-        if (not Path(images_dir, 'icon.ico').is_file()
-                or not Path(images_dir, 'icon.png').is_file()):
-            dlg = messagebox.showerror(
-                '',
-                'icon.ico or icon.png not in images directory'
-            )
+            testing,
+            incremental,
+            reporter,
+            force)
+
+    def problems(self) -> list[str]:
+        """Return what would stop the project building correctly."""
+        self.resolve_directories()
+        if not self.dev_base_dir or not Path(self.dev_base_dir).is_dir():
+            return [f'Project directory {self.dev_base_dir!r} not found']
+        if not self.dev_source_dir or not Path(self.dev_source_dir).is_dir():
+            return [f'Source directory {self.dev_source_dir!r} not found']
+
+        problems = []
+        if not Path(self.dev_source_dir, 'main.py').is_file():
+            problems.append(f'main.py not in {self.dev_source_dir}')
+        images_dir = Path(self.dev_source_dir, 'images')
+        for icon in ICON_FILES:
+            if not Path(images_dir, icon).is_file():
+                problems.append(f'{icon} not in {images_dir}')
+        return problems
+
+
+class LazyProjects(MutableMapping):
+    """Projects keyed by id, each read and built on first access.
+
+    Listing or testing ids only touches the store's ids, so the main
+    window opens without constructing every project.
+    """
+    def __init__(self, store) -> None:
+        self.store = store
+        self._ids = set(store.ids())
+        self._projects: dict[str, Project] = {}
+
+    def __getitem__(self, id: str) -> Project:
+        if id not in self._ids:
+            raise KeyError(id)
+        if id not in self._projects:
+            data = self.store.read(id)
+            if data is None:
+                raise KeyError(id)
+            self._projects[id] = ProjectServer._project(id, data)
+        return self._projects[id]
+
+    def __setitem__(self, id: str, project: Project) -> None:
+        self._ids.add(id)
+        self._projects[id] = project
+
+    def __delitem__(self, id: str) -> None:
+        self._ids.remove(id)
+        self._projects.pop(id, None)
+
+    def __contains__(self, id: object) -> bool:
+        return id in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def loaded(self) -> dict[str, Project]:
+        """Return the projects that have been read so far."""
+        return dict(self._projects)
 
 
 class ProjectServer():
+    """Projects keyed by id, held in a project store.
+
+    The store is chosen by the suffix of path: SQLite (.db), a
+    journal (.jsonl) or a JSON file. Without a path the project_store
+    config setting picks the store; the first time the default SQLite
+    store is opened the projects in PROJECT_FILE are migrated.
+    """
     def __init__(self, path: str = '') -> None:
-        self.projects = []
+        self.projects = {}
+        json_path = None
         if not path:
-            path = PROJECT_FILE
+            path = default_store_path()
+            json_path = PROJECT_FILE
         self.path = path
-        if self.path:
-            self.projects = self.read_projects()
+        self.store = project_store(path, json_path)
+        self.projects = self.read_projects()
 
-    def read_projects(self) -> list[Project]:
-        projects = {}
-        try:
-            with open(PROJECT_FILE, 'r', encoding='utf-8') as f_projects:
-                raw_data = json.load(f_projects)
-            for id, data in raw_data.items():
-                project = Project(data)
-                project.id = id
-                projects[id] = project
-        except FileNotFoundError:
-            logger.error(f'{PROJECT_FILE} FileNotFoundError')
-        except IsADirectoryError:
-            logger.error(f'{PROJECT_FILE} IsADirectoryError')
-        except json.decoder.JSONDecodeError:
-            logger.error(f'{PROJECT_FILE} JSONDecodeError')
+    def read_projects(self) -> LazyProjects:
+        projects = LazyProjects(self.store)
+        self.signature = self.store.signature()
         return projects
 
-    def save_projects(self, projects: list[Project] = None) -> None:
-        with contextlib.suppress(FileExistsError):
-            os.makedirs(USER_DATA_DIR)
+    def is_current(self) -> bool:
+        """Return False if the store has changed since it was read."""
+        return self.store.signature() == self.signature
+
+    def read_project(self, id: str) -> Project | None:
+        data = self.store.read(id)
+        if data is None:
+            return None
+        return self._project(id, data)
+
+    def save_project(self, project: Project) -> None:
+        if not project.id:
+            project.id = project.name
+        self.projects[project.id] = project
+        self.store.save(project.id, vars(project))
+        self.signature = self.store.signature()
+
+    def save_projects(self, projects: dict[str, Project] = None) -> None:
         if not projects:
-            projects = self.projects
+            # Projects never read are unchanged in the store
+            projects = self.projects.loaded()
+
+        self.store.save_all({project.id: vars(project)
+                             for project in projects.values()})
+        self.signature = self.store.signature()
+
+    @staticmethod
+    def _project(id: str, data: dict) -> Project:
+        project = Project(data)
+        project.id = id
+        return project
+
+
+def default_store_path() -> Path:
+    """Return the project store path for the project_store setting."""
+    return STORE_PATHS.get(get_config().project_store, PROJECT_DB)
+
+
+def switch_project_store(old: str, new: str) -> None:
+    """Move the projects to the store for a new project_store setting."""
+    if old == new:
+        return
+    migrate_projects(STORE_PATHS.get(old, PROJECT_DB),
+                     STORE_PATHS.get(new, PROJECT_DB))
+
+
+def get_project_server(path: str = '') -> ProjectServer:
+    """Return this process's ProjectServer for path.
+
+    The server is shared by every form and entry point and is only
+    replaced when the store has been changed by another process.
+    """
+    key = str(Path(path or default_store_path()).resolve())
+    with _servers_lock:
+        server = _servers.get(key)
+        if server is None or not server.is_current():
+            server = ProjectServer(path)
+            _servers[key] = server
+        return server
+
+
+def _find_directories(base_dir: str) -> dict[str, str]:
+    """Return the shallowest directory matching each of DIRECTORY_NAMES.
+
+    The tree is searched breadth first in a single pass that skips
+    PRUNED_DIRECTORIES and stops once every name has been found. Only
+    a search that found every directory is cached, and only while those
+    directories exist, so a project set up later is found.
+    """
+    cached = _directory_cache.get(base_dir)
+    if cached and all(os.path.isdir(path) for path in cached.values()):
+        return cached
+    _directory_cache.pop(base_dir, None)
+
+    wanted = {name: attribute
+              for attribute, names in DIRECTORY_NAMES.items()
+              for name in names}
+    found = {}
+    queue = deque([base_dir])
+    while queue and len(found) < len(DIRECTORY_NAMES):
+        try:
+            with os.scandir(queue.popleft()) as entries:
+                subdirs = [entry for entry in entries if entry.is_dir()]
+        except OSError:
+            continue
+
+        for entry in subdirs:
+            attribute = wanted.get(entry.name)
+            if attribute and attribute not in found:
+                found[attribute] = entry.path
+            if (entry.name not in PRUNED_DIRECTORIES
+                    and not entry.name.endswith('.egg-info')
+                    and not entry.is_symlink()):
+                queue.append(entry.path)
 
-        projects_dict = {project.id: vars(project)
-                         for project in projects.values()}
-        with open(PROJECT_FILE, 'w', encoding='utf-8') as f_projects:
-            json.dump(projects_dict, f_projects)
+    if len(found) == len(DIRECTORY_NAMES):
+        _directory_cache[base_dir] = found
+    return found
@@ -0,0 +1,130 @@
+"""Project requirements (uv pip freeze) for Windows converter."""
+import hashlib
+import json
+import os
+import subprocess
+from pathlib import Path
+
+from windows_converter.constants import USER_DATA_DIR
+from windows_converter.metrics import count
+from windows_converter import logger
+
+CACHE_DIR = Path(USER_DATA_DIR, 'requirements')
+REQUIREMENTS_FILE = 'requirements.txt'
+FINGERPRINT_FILES = ('uv.lock', 'pyproject.toml')
+EXCLUDED_PACKAGES = ('pygobject',)
+
+
+def create_requirements(project, cache_dir: Path = CACHE_DIR) -> bool:
+    """Write requirements.txt in the project's development directory.
+
+    The freeze is skipped when the virtual environment, uv.lock and
+    pyproject.toml are unchanged since the last one, as recorded in
+    cache_dir. Returns False if the requirements could not be created.
+    """
+    venv_dir = Path(project.dev_base_dir, '.venv')
+    req_path = Path(project.dev_base_dir, REQUIREMENTS_FILE)
+    cache_path = Path(cache_dir, f'{project.name}.json')
+
+    fingerprint = venv_fingerprint(project.dev_base_dir)
+    cached = _read_cache(cache_path)
+    if cached.get('fingerprint') == fingerprint:
+        if _read_text(req_path) != cached['requirements']:
+            req_path.write_text(cached['requirements'])
+        logger.info('Project dependencies unchanged')
+        return True
+
+    if not _has_pip(venv_dir):
+        try:
+            subprocess.run(
+                [_venv_python(venv_dir), '-m', 'ensurepip', '--upgrade'],
+                check=True,
+                capture_output=True)
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return False
+        # ensurepip changes site-packages
+        fingerprint = venv_fingerprint(project.dev_base_dir)
+
+    try:
+        freeze = subprocess.run(
+            ['uv', 'pip', 'freeze', '--exclude-editable'],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=project.dev_base_dir
+        )
+        lines = [line for line in freeze.stdout.splitlines()
+                 if not line.startswith(EXCLUDED_PACKAGES)]
+        requirements = '\n'.join(lines) + '\n'
+        req_path.write_text(requirements)
+        count(size=len(requirements))
+        logger.info(
+            "Updated project dependencies"
+        )
+    except Exception as e:
+        logger.warning(f'{req_path} not created', Exception=f'{e}')
+        return False
+
+    _save_cache(cache_path, {
+        'fingerprint': fingerprint,
+        'requirements': requirements,
+    })
+    return True
+
+
+def venv_fingerprint(dev_base_dir: str) -> str:
+    """Return a digest of the installed distributions and lock files."""
+    digest = hashlib.sha256()
+    for site_packages in _site_packages(Path(dev_base_dir, '.venv')):
+        with os.scandir(site_packages) as entries:
+            names = sorted(
+                (entry.name, entry.stat().st_mtime_ns) for entry in entries
+                if entry.name.endswith('.dist-info'))
+        digest.update(repr(names).encode())
+
+    for file_name in FINGERPRINT_FILES:
+        path = Path(dev_base_dir, file_name)
+        if path.is_file():
+            digest.update(file_name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _site_packages(venv_dir: Path) -> list[Path]:
+    # lib/pythonX.Y/site-packages on Unix, Lib/site-packages on Windows
+    return sorted(
+        list(venv_dir.glob('lib/python*/site-packages'))
+        + list(venv_dir.glob('Lib/site-packages')))
+
+
+def _has_pip(venv_dir: Path) -> bool:
+    return any(
+        Path(site_packages, 'pip').is_dir()
+        for site_packages in _site_packages(venv_dir))
+
+
+def _venv_python(venv_dir: Path) -> Path:
+    if Path(venv_dir, 'Scripts').is_dir():
+        return Path(venv_dir, 'Scripts', 'python.exe')
+    return Path(venv_dir, 'bin', 'python')
+
+
+def _read_text(path: Path) -> str:
+    try:
+        return path.read_text()
+    except FileNotFoundError:
+        return ''
+
+
+def _read_cache(cache_path: Path) -> dict:
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f_cache:
+            return json.load(f_cache)
+    except (FileNotFoundError, json.decoder.JSONDecodeError):
+        return {}
+
+
+def _save_cache(cache_path: Path, data: dict) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as f_cache:
+        json.dump(data, f_cache)
@@ -10,9 +10,6 @@ from psiutils.widgets import get_styles
 from psiutils.utilities import display_icon
 
 from windows_converter.constants import ICON_FILE
-from windows_converter.module_caller import ModuleCaller
-
-from windows_converter.forms.frm_main import MainFrame
 
 
 class Root():
@@ -26,11 +23,14 @@ class Root():
 
         get_styles()
 
+        # Forms are imported when first shown to keep startup short
         dlg = None
         if len(sys.argv) > 1:
+            from windows_converter.module_caller import ModuleCaller
             module = sys.argv[1]
             dlg = ModuleCaller(root, module)
         if not dlg or dlg.invalid:
+            from windows_converter.forms.frm_main import MainFrame
             MainFrame(root)
 
         root.mainloop()
@@ -0,0 +1,179 @@
+"""Schedule the builds of many projects for Windows converter."""
+import heapq
+import itertools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from windows_converter.config import get_config, TomlConfig
+from windows_converter.build import build_project
+from windows_converter import logger
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+STATUS_OK = 'ok'
+STATUS_FAILED = 'failed'
+STATUS_ERROR = 'error'
+
+# Builds run threaded stages, and forking a process with threads is not
+# safe, so the workers are started fresh
+POOL_START_METHOD = 'spawn'
+
+
+@dataclass(order=True)
+class BuildRequest:
+    priority: int
+    sequence: int
+    project: object = field(compare=False)
+    update_requirements: bool = field(default=False, compare=False)
+    incremental: bool = field(default=False, compare=False)
+
+
+@dataclass
+class BuildSummary:
+    project: str
+    status: str
+    duration: float = 0.0
+    files_copied: int = 0
+    bytes_copied: int = 0
+    error: str = ''
+
+
+class BuildScheduler():
+    """Run project builds across a process pool in priority order.
+
+    At most max_workers builds run at once; the rest wait in a priority
+    queue so a build submitted with PRIORITY_INTERACTIVE starts before
+    any queued batch build.
+    """
+    def __init__(self, config: TomlConfig, max_workers: int = 0) -> None:
+        self.config_path = str(config.path)
+        self.max_workers = max_workers or config.build_workers
+        self.summaries = []
+        self._queue = []
+        self._sequence = itertools.count()
+        self._running = 0
+        self._lock = threading.RLock()
+        self._idle = threading.Condition(self._lock)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context(POOL_START_METHOD))
+
+    def submit(
+            self,
+            project: object,
+            priority: int = PRIORITY_BATCH,
+            update_requirements: bool = False,
+            incremental: bool = False,
+            ) -> None:
+        request = BuildRequest(
+            priority,
+            next(self._sequence),
+            project,
+            update_requirements,
+            incremental,
+        )
+        with self._lock:
+            heapq.heappush(self._queue, request)
+            self._dispatch()
+
+    def wait(self) -> list[BuildSummary]:
+        """Block until every submitted build has finished."""
+        with self._idle:
+            self._idle.wait_for(lambda: not self._queue and not self._running)
+        return list(self.summaries)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown()
+
+    def _dispatch(self) -> None:
+        # Called with the lock held
+        while self._queue and self._running < self.max_workers:
+            request = heapq.heappop(self._queue)
+            self._running += 1
+            start_time = time.perf_counter()
+            future = self._executor.submit(
+                _build_worker,
+                request.project,
+                self.config_path,
+                request.update_requirements,
+                request.incremental,
+            )
+            future.add_done_callback(
+                lambda future, request=request, start_time=start_time:
+                self._build_done(future, request, start_time))
+
+    def _build_done(
+            self,
+            future: Future,
+            request: BuildRequest,
+            start_time: float) -> None:
+        summary = _summarise(future, request.project, start_time)
+        logger.info(
+            f'Build of {summary.project} {summary.status}',
+            duration=round(summary.duration, 2),
+            bytes_copied=summary.bytes_copied)
+        with self._lock:
+            self.summaries.append(summary)
+            self._running -= 1
+            self._dispatch()
+            self._idle.notify_all()
+
+
+def build_many(
+        projects: list,
+        config: TomlConfig,
+        max_workers: int = 0,
+        update_requirements: bool = False,
+        incremental: bool = False,
+        ) -> list[BuildSummary]:
+    """Build all projects concurrently and return a summary of each."""
+    scheduler = BuildScheduler(config, max_workers)
+    try:
+        for project in projects:
+            scheduler.submit(
+                project,
+                update_requirements=update_requirements,
+                incremental=incremental)
+        summaries = scheduler.wait()
+    finally:
+        scheduler.shutdown()
+
+    failed = [summary.project for summary in summaries
+              if summary.status != STATUS_OK]
+    logger.info(
+        f'Built {len(summaries) - len(failed)} of {len(summaries)} projects',
+        failed=failed)
+    return summaries
+
+
+def _build_worker(
+        project: object,
+        config_path: str,
+        update_requirements: bool,
+        incremental: bool) -> object:
+    config = get_config(config_path)
+    return build_project(
+        project, config, update_requirements, incremental=incremental)
+
+
+def _summarise(
+        future: Future, project: object, start_time: float) -> BuildSummary:
+    duration = time.perf_counter() - start_time
+    try:
+        result = future.result()
+    except Exception as err:
+        return BuildSummary(
+            project.name, STATUS_ERROR, duration, error=str(err))
+
+    status = STATUS_OK if result.status == project.status_ok else STATUS_FAILED
+    return BuildSummary(
+        project.name,
+        status,
+        result.duration,
+        result.files_copied,
+        result.bytes_copied,
+    )
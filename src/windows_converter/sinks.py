@@ -0,0 +1,432 @@
+"""Output targets of a build for Windows converter.
+
+A build writes each file to a sink by its name relative to the project
+directory. DirectorySink writes the windows-projects tree; ZipSink and
+TarSink write one archive without the tree, compressing files in
+parallel threads (zlib releases the GIL while it compresses). Files are
+read and compressed in chunks, so a large file is never held in memory.
+"""
+import gzip
+import io
+import os
+import shutil
+import stat
+import struct
+import tarfile
+import tempfile
+import threading
+import time
+import zlib
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO
+
+from windows_converter.copier import (
+    DEFAULT_WORKERS, MODE_COPY, STREAM_BUFFER_SIZE, materialize_file,
+    remove_file)
+
+SINK_DIRECTORY = 'directory'
+SINK_ZIP = 'zip'
+SINK_TAR = 'tar'
+OUTPUT_SINKS = (SINK_DIRECTORY, SINK_ZIP, SINK_TAR)
+
+ARCHIVE_SUFFIXES = {SINK_ZIP: '.zip', SINK_TAR: '.tar.gz'}
+COMPRESS_LEVEL = 6
+
+# Permissions of entries that are not copied from a file
+FILE_MODE = 0o644
+DIRECTORY_MODE = 0o755
+
+# Entries compressed ahead of the one being written, per worker
+QUEUE_DEPTH = 4
+# A compressed entry larger than this waits in a temporary file
+SPOOL_SIZE = STREAM_BUFFER_SIZE
+
+ZIP64_MARKER = 0xFFFFFFFF
+ZIP64_ENTRIES_MARKER = 0xFFFF
+# Sizes, offsets and entry counts from these up need ZIP64 records
+ZIP_LIMIT = ZIP64_MARKER
+ZIP_MAX_ENTRIES = ZIP64_ENTRIES_MARKER
+ZIP64_EXTRA = 0x0001
+ZIP_UTF8 = 0x800
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+ZIP_VERSION = 20
+ZIP64_VERSION = 45
+
+
+class OutputSink():
+    """Where a build writes its files."""
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+
+    def write_file(self, name: str, source: Path) -> int:
+        """Write the file at source as name and return its size."""
+        raise NotImplementedError
+
+    def write_bytes(self, name: str, data: bytes) -> int:
+        """Write data as name and return its size."""
+        raise NotImplementedError
+
+    def write_directory(self, name: str) -> None:
+        """Make sure the directory name exists, even if it stays empty."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Finish the output; nothing is complete until this returns."""
+
+    def abort(self) -> None:
+        """Discard an output that will not be completed."""
+
+
+class DirectorySink(OutputSink):
+    """Write files into the directory at path."""
+    def __init__(self, path: Path, mode: str = MODE_COPY) -> None:
+        super().__init__(path)
+        self.mode = mode
+
+    def write_file(self, name: str, source: Path) -> int:
+        target = Path(self.path, name)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        return materialize_file(source, target, self.mode)
+
+    def write_bytes(self, name: str, data: bytes) -> int:
+        target = Path(self.path, name)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # The path may be a link into the development tree
+        remove_file(target)
+        with open(target, 'wb') as f_target:
+            f_target.write(data)
+        return len(data)
+
+    def write_directory(self, name: str) -> None:
+        Path(self.path, name).mkdir(parents=True, exist_ok=True)
+
+
+class ArchiveSink(OutputSink):
+    """Compress entries in a thread pool and write them in order.
+
+    Entries are named root/name in the archive, so it unpacks to the
+    same tree as DirectorySink. The archive is written to a temporary
+    file and only replaces path when it is closed.
+    """
+    def __init__(
+            self,
+            path: Path,
+            root: str,
+            workers: int = DEFAULT_WORKERS,
+            level: int = COMPRESS_LEVEL) -> None:
+        super().__init__(path)
+        self.root = root
+        self.level = level
+        self.workers = max(1, workers or DEFAULT_WORKERS)
+        self._temp_path = Path(f'{self.path}.tmp')
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self._temp_path, 'wb')
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._pending: deque[Future] = deque()
+        self._lock = threading.Lock()
+
+    def write_file(self, name: str, source: Path) -> int:
+        file_stat = os.stat(source)
+        # Keep the permissions, e.g. the executable bit of scripts
+        self._submit(self._archive_name(name), file_stat.st_mtime,
+                     file_stat.st_size, file_stat.st_mode & 0o777,
+                     lambda: open(source, 'rb'))
+        return file_stat.st_size
+
+    def write_bytes(self, name: str, data: bytes) -> int:
+        self._submit(self._archive_name(name), time.time(), len(data),
+                     FILE_MODE, lambda: io.BytesIO(data))
+        return len(data)
+
+    def write_directory(self, name: str) -> None:
+        with self._lock:
+            self._drain(0)
+            self._write_directory(f'{self._archive_name(name)}/', time.time())
+
+    def close(self) -> None:
+        with self._lock:
+            self._drain(0)
+            self._write_end()
+            self._file.close()
+        self._executor.shutdown()
+        os.replace(self._temp_path, self.path)
+
+    def abort(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
+        self._file.close()
+        self._temp_path.unlink(missing_ok=True)
+
+    def _archive_name(self, name: str) -> str:
+        return f'{self.root}/{Path(name).as_posix()}'
+
+    def _submit(
+            self,
+            name: str,
+            mtime: float,
+            size: int,
+            mode: int,
+            open_source: Callable[[], BinaryIO]) -> None:
+        future = self._executor.submit(
+            self._compress, name, mtime, size, mode, open_source)
+        with self._lock:
+            self._pending.append(future)
+            # Bound the memory held by compressed entries not yet written
+            self._drain(self.workers * QUEUE_DEPTH)
+
+    def _drain(self, keep: int) -> None:
+        while len(self._pending) > keep or (
+                self._pending and self._pending[0].done()):
+            self._write_entry(*self._pending.popleft().result())
+
+    def _spool(self) -> tempfile.SpooledTemporaryFile:
+        return tempfile.SpooledTemporaryFile(
+            max_size=SPOOL_SIZE, dir=self.path.parent)
+
+    def _compress(
+            self,
+            name: str,
+            mtime: float,
+            size: int,
+            mode: int,
+            open_source: Callable[[], BinaryIO]) -> tuple:
+        raise NotImplementedError
+
+    def _write_entry(self, *entry) -> None:
+        raise NotImplementedError
+
+    def _write_directory(self, name: str, mtime: float) -> None:
+        raise NotImplementedError
+
+    def _write_end(self) -> None:
+        raise NotImplementedError
+
+
+class ZipSink(ArchiveSink):
+    """Write a zip archive, deflating its members in parallel."""
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._central = []
+
+    def _compress(
+            self,
+            name: str,
+            mtime: float,
+            size: int,
+            mode: int,
+            open_source: Callable[[], BinaryIO]) -> tuple:
+        spool = self._spool()
+        compressor = zlib.compressobj(
+            self.level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        crc = size = 0
+        with open_source() as f_source:
+            for chunk in _read_chunks(f_source):
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+                spool.write(compressor.compress(chunk))
+        spool.write(compressor.flush())
+        method = ZIP_DEFLATED
+        if spool.tell() >= size:
+            # Stored is smaller for data that does not compress. The CRC
+            # and size are taken again from the data stored, in case the
+            # file changed since it was compressed.
+            spool.seek(0)
+            spool.truncate()
+            crc = size = 0
+            with open_source() as f_source:
+                for chunk in _read_chunks(f_source):
+                    crc = zlib.crc32(chunk, crc)
+                    size += len(chunk)
+                    spool.write(chunk)
+            method = ZIP_STORED
+        return (name, mtime, method, crc, size, spool,
+                stat.S_IFREG | mode)
+
+    def _write_directory(self, name: str, mtime: float) -> None:
+        self._write_entry(name, mtime, ZIP_STORED, 0, 0, None,
+                          stat.S_IFDIR | DIRECTORY_MODE)
+
+    def _write_entry(
+            self,
+            name: str,
+            mtime: float,
+            method: int,
+            crc: int,
+            size: int,
+            spool: tempfile.SpooledTemporaryFile | None,
+            mode: int) -> None:
+        compressed_size = spool.tell() if spool else 0
+        offset = self._file.tell()
+        encoded = name.encode('utf-8')
+        dos_time, dos_date = _dos_date_time(mtime)
+
+        # The local ZIP64 extra field holds both sizes if either is large
+        local_sizes = [compressed_size, size]
+        local_extra = b''
+        if max(local_sizes) >= ZIP_LIMIT:
+            local_sizes = [ZIP64_MARKER, ZIP64_MARKER]
+            local_extra = _zip64_extra(size, compressed_size)
+        version = ZIP64_VERSION if local_extra else ZIP_VERSION
+        self._file.write(struct.pack(
+            '<4s5H3L2H', b'PK\x03\x04', version, ZIP_UTF8, method,
+            dos_time, dos_date, crc, *local_sizes, len(encoded),
+            len(local_extra)))
+        self._file.write(encoded)
+        self._file.write(local_extra)
+        if spool:
+            _copy_spool(spool, self._file)
+
+        # The central ZIP64 extra field holds only the values that are large
+        values = (size, compressed_size, offset)
+        extra = _zip64_extra(*(value for value in values
+                               if value >= ZIP_LIMIT))
+        size, compressed_size, offset = (
+            ZIP64_MARKER if value >= ZIP_LIMIT else value
+            for value in values)
+        version = ZIP64_VERSION if extra else ZIP_VERSION
+        # Unix mode in the high word; 0x10 is the MS-DOS directory bit
+        external = mode << 16 | (0x10 if name.endswith('/') else 0)
+        self._central.append(struct.pack(
+            '<4s6H3L5H2L', b'PK\x01\x02', 3 << 8 | version, version,
+            ZIP_UTF8, method, dos_time, dos_date, crc, compressed_size, size,
+            len(encoded), len(extra), 0, 0, 0, external, offset)
+            + encoded + extra)
+
+    def _write_end(self) -> None:
+        entries = len(self._central)
+        offset = self._file.tell()
+        size = sum(len(record) for record in self._central)
+        for record in self._central:
+            self._file.write(record)
+        if entries >= ZIP_MAX_ENTRIES or max(offset, size) >= ZIP_LIMIT:
+            end_offset = self._file.tell()
+            self._file.write(struct.pack(
+                '<4sQ2H2L4Q', b'PK\x06\x06', 44, 3 << 8 | ZIP64_VERSION,
+                ZIP64_VERSION, 0, 0, entries, entries, size, offset))
+            self._file.write(struct.pack(
+                '<4sLQL', b'PK\x06\x07', 0, end_offset, 1))
+            entries = min(entries, ZIP64_ENTRIES_MARKER)
+            size, offset = min(size, ZIP64_MARKER), min(offset, ZIP64_MARKER)
+        self._file.write(struct.pack(
+            '<4s4H2LH', b'PK\x05\x06', 0, 0, entries, entries, size,
+            offset, 0))
+
+
+class TarSink(ArchiveSink):
+    """Write a tar.gz archive as one gzip member per entry.
+
+    Concatenated gzip members are one valid gzip stream, so each entry
+    can be compressed by its own worker. Unlike pigz, which splits one
+    deflate stream and primes each block with the previous block's
+    data, every member starts with an empty dictionary, so many small
+    files compress a little worse than with tar czf.
+    """
+    def _compress(
+            self,
+            name: str,
+            mtime: float,
+            size: int,
+            mode: int,
+            open_source: Callable[[], BinaryIO]) -> tuple:
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = int(mtime)
+        info.mode = mode
+        spool = self._spool()
+        compressor = zlib.compressobj(
+            self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        spool.write(compressor.compress(_tar_header(info)))
+        with open_source() as f_source:
+            for chunk in _read_chunks(f_source):
+                size -= len(chunk)
+                spool.write(compressor.compress(chunk))
+        if size:
+            # The header already holds the size from before the change
+            raise OSError(f'{name} changed while it was archived')
+        spool.write(compressor.compress(_tar_padding(info.size)))
+        spool.write(compressor.flush())
+        return (spool,)
+
+    def _write_directory(self, name: str, mtime: float) -> None:
+        info = tarfile.TarInfo(name.rstrip('/'))
+        info.type = tarfile.DIRTYPE
+        info.mtime = int(mtime)
+        info.mode = DIRECTORY_MODE
+        self._file.write(_gzip(_tar_header(info), self.level))
+
+    def _write_entry(self, spool: tempfile.SpooledTemporaryFile) -> None:
+        _copy_spool(spool, self._file)
+
+    def _write_end(self) -> None:
+        self._file.write(_gzip(tarfile.NUL * 2 * tarfile.BLOCKSIZE,
+                               self.level))
+
+
+def output_sink(
+        kind: str,
+        build_project_dir: Path,
+        mode: str = MODE_COPY,
+        workers: int = DEFAULT_WORKERS) -> OutputSink:
+    """Return the sink of kind (see OUTPUT_SINKS) for a project's build."""
+    path = sink_path(kind, build_project_dir)
+    if kind == SINK_DIRECTORY:
+        return DirectorySink(path, mode)
+    sinks = {SINK_ZIP: ZipSink, SINK_TAR: TarSink}
+    return sinks[kind](path, Path(build_project_dir).name, workers)
+
+
+def sink_path(kind: str, build_project_dir: Path) -> Path:
+    """Return where a sink of kind writes a project's build.
+
+    An archive is written beside the project's directory, named after it.
+    """
+    build_project_dir = Path(build_project_dir)
+    if kind == SINK_DIRECTORY:
+        return build_project_dir
+    if kind not in ARCHIVE_SUFFIXES:
+        raise ValueError(f'Invalid output sink: {kind}')
+    return Path(build_project_dir.parent,
+                f'{build_project_dir.name}{ARCHIVE_SUFFIXES[kind]}')
+
+
+def _read_chunks(f_source: BinaryIO) -> Iterator[bytes]:
+    while chunk := f_source.read(STREAM_BUFFER_SIZE):
+        yield chunk
+
+
+def _copy_spool(
+        spool: tempfile.SpooledTemporaryFile,
+        f_target: BinaryIO) -> None:
+    spool.seek(0)
+    shutil.copyfileobj(spool, f_target, STREAM_BUFFER_SIZE)
+    spool.close()
+
+
+def _zip64_extra(*values: int) -> bytes:
+    if not values:
+        return b''
+    return struct.pack(f'<2H{len(values)}Q', ZIP64_EXTRA, 8 * len(values),
+                       *values)
+
+
+def _tar_header(info: tarfile.TarInfo) -> bytes:
+    return info.tobuf(tarfile.PAX_FORMAT, 'utf-8', 'surrogateescape')
+
+
+def _tar_padding(size: int) -> bytes:
+    remainder = size % tarfile.BLOCKSIZE
+    return tarfile.NUL * (tarfile.BLOCKSIZE - remainder if remainder else 0)
+
+
+def _gzip(data: bytes, level: int) -> bytes:
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _dos_date_time(mtime: float) -> tuple[int, int]:
+    local = time.localtime(mtime)
+    year = min(max(local.tm_year, 1980), 2107)
+    return ((local.tm_hour << 11) | (local.tm_min << 5) | (local.tm_sec // 2),
+            ((year - 1980) << 9) | (local.tm_mon << 5) | local.tm_mday)
@@ -0,0 +1,115 @@
+"""Run the stages of a build as a dependency graph."""
+from collections.abc import Callable
+from concurrent.futures import (
+    FIRST_COMPLETED, Future, ThreadPoolExecutor, wait)
+from dataclasses import dataclass
+
+from windows_converter.metrics import StageMetrics, measure
+from windows_converter.progress import ProgressReporter
+
+
+@dataclass
+class Stage:
+    """A unit of build work.
+
+    A stage starts once every stage that provides one of its requires
+    has finished; stages with no dependency between them run at the same
+    time.
+    """
+    name: str
+    action: Callable[[], object]
+    requires: tuple[str, ...] = ()
+    provides: tuple[str, ...] = ()
+
+
+def run_stages(
+        stages: list[Stage],
+        max_workers: int = 0,
+        reporter: ProgressReporter | None = None,
+        metrics: list[StageMetrics] | None = None,
+        ) -> dict:
+    """Run the stages concurrently in dependency order.
+
+    Returns the value of each stage's action keyed by stage name. If a
+    stage raises, no further stages are started and the first exception
+    is raised once the running stages have finished. The start and end
+    of each stage are reported to reporter and, if metrics is given, the
+    StageMetrics of each finished stage are appended to it.
+    """
+    if reporter is None:
+        reporter = ProgressReporter()
+    if metrics is None:
+        metrics = []
+    dependencies = _dependencies(stages)
+    results = {}
+    pending = {stage.name: stage for stage in stages}
+    running: dict[Future, str] = {}
+    error = None
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(stages)) as pool:
+        while pending or running:
+            if error is None:
+                for name in [name for name in pending
+                             if dependencies[name] <= results.keys()]:
+                    stage = pending.pop(name)
+                    future = pool.submit(_run_stage, stage, reporter, metrics)
+                    running[future] = name
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as err:
+                    if error is None:
+                        error = err
+
+    if error is not None:
+        raise error
+    return results
+
+
+def _run_stage(
+        stage: Stage,
+        reporter: ProgressReporter,
+        metrics: list[StageMetrics]) -> object:
+    reporter.stage(stage.name)
+    with measure(stage.name) as stage_metrics:
+        result = stage.action()
+    metrics.append(stage_metrics)
+    reporter.stage(stage.name, finished=True)
+    return result
+
+
+def _dependencies(stages: list[Stage]) -> dict[str, set[str]]:
+    providers = {}
+    for stage in stages:
+        for output in stage.provides:
+            providers[output] = stage.name
+
+    dependencies = {}
+    for stage in stages:
+        unknown = [item for item in stage.requires if item not in providers]
+        if unknown:
+            raise ValueError(f'Stage {stage.name} requires unknown {unknown}')
+        dependencies[stage.name] = {
+            providers[item] for item in stage.requires}
+
+    _check_acyclic(dependencies)
+    return dependencies
+
+
+def _check_acyclic(dependencies: dict[str, set[str]]) -> None:
+    resolved = set()
+    remaining = dict(dependencies)
+    while remaining:
+        ready = [name for name, needs in remaining.items()
+                 if needs <= resolved]
+        if not ready:
+            raise ValueError(f'Stage cycle between {sorted(remaining)}')
+        for name in ready:
+            resolved.add(name)
+            del remaining[name]
@@ -0,0 +1,155 @@
+"""Incremental synchronisation of build trees for Windows converter."""
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from windows_converter import logger
+from windows_converter.copier import (
+    DEFAULT_WORKERS, MODE_COPY, copy_file_hashed, materialize_file,
+    remove_file)
+from windows_converter.progress import ProgressReporter
+
+MANIFEST_FILE = '.build_manifest.json'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class SyncResult:
+    copied: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    bytes_copied: int = 0
+
+
+def read_manifest(build_project_dir: Path) -> dict:
+    """Return the build manifest stored in the build directory."""
+    manifest_path = Path(build_project_dir, MANIFEST_FILE)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f_manifest:
+            manifest = json.load(f_manifest)
+    except FileNotFoundError:
+        return {}
+    except json.decoder.JSONDecodeError:
+        logger.warning(f'{manifest_path} JSONDecodeError')
+        return {}
+    if not isinstance(manifest, dict):
+        return {}
+    return manifest
+
+
+def save_manifest(build_project_dir: Path, manifest: dict) -> None:
+    """Save the build manifest atomically in the build directory."""
+    manifest_path = Path(build_project_dir, MANIFEST_FILE)
+    temp_path = manifest_path.with_suffix('.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f_manifest:
+        json.dump(manifest, f_manifest)
+    os.replace(temp_path, manifest_path)
+
+
+def sync_tree(
+        source_dir: Path,
+        target_dir: Path,
+        manifest: dict,
+        workers: int = DEFAULT_WORKERS,
+        reporter: ProgressReporter | None = None,
+        stage: str = '',
+        mode: str = MODE_COPY,
+        ) -> tuple[SyncResult, dict]:
+    """Bring target_dir in line with source_dir.
+
+    Only files that are new or whose content has changed since the
+    manifest was written are copied; files that have disappeared from
+    source_dir are removed from target_dir. Returns the result and the
+    manifest entries for the new state of the tree. Files are copied or
+    linked according to mode (see copier.MATERIALIZE_MODES).
+
+    Each copied file is reported to reporter under stage, and the sync
+    stops with BuildCancelled if the reporter is cancelled.
+    """
+    if reporter is None:
+        reporter = ProgressReporter()
+    result = SyncResult()
+    entries = {}
+    candidates = []
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    for directory_name, subdir_list, file_list in os.walk(source_dir):
+        relative_dir = Path(directory_name).relative_to(source_dir)
+        for subdir_name in subdir_list:
+            Path(target_dir, relative_dir, subdir_name).mkdir(exist_ok=True)
+
+        for file_name in file_list:
+            relative = Path(relative_dir, file_name).as_posix()
+            stat = Path(directory_name, file_name).stat()
+            entry = manifest.get(relative)
+            if (entry and entry['size'] == stat.st_size
+                    and entry['mtime'] == stat.st_mtime_ns
+                    and Path(target_dir, relative).is_file()):
+                entries[relative] = entry
+                result.unchanged += 1
+                continue
+            candidates.append((relative, stat))
+    reporter.planned(len(candidates))
+
+    def _sync_file(candidate: tuple) -> tuple[str, dict, int]:
+        reporter.check()
+        relative, stat = candidate
+        source = Path(source_dir, relative)
+        target = Path(target_dir, relative)
+        entry = manifest.get(relative)
+        new_entry = {'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+        if entry is None and mode == MODE_COPY:
+            # Nothing to compare with, so hash the data as it is copied
+            size, new_entry['hash'] = copy_file_hashed(source, target)
+            reporter.copied(stage, size)
+            return relative, new_entry, size
+
+        new_entry['hash'] = file_hash(source)
+        if (entry and entry['hash'] == new_entry['hash'] and target.is_file()
+                and target.stat().st_size == stat.st_size):
+            return relative, new_entry, -1
+        size = materialize_file(source, target, mode)
+        reporter.copied(stage, size)
+        return relative, new_entry, size
+
+    workers = max(1, min(workers or DEFAULT_WORKERS, len(candidates)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for relative, entry, size in executor.map(_sync_file, candidates):
+            entries[relative] = entry
+            if size < 0:
+                result.unchanged += 1
+            else:
+                result.copied += 1
+                result.bytes_copied += size
+
+    for relative in set(manifest) - set(entries):
+        _remove_stale(target_dir, relative)
+        result.deleted += 1
+
+    return result, entries
+
+
+def file_hash(path: Path) -> str:
+    """Return the sha256 digest of the file at path."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f_source:
+        while chunk := f_source.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _remove_stale(target_dir: Path, relative: str) -> None:
+    target = Path(target_dir, relative)
+    remove_file(target)
+
+    # Remove directories left empty by the deletion
+    parent = target.parent
+    while parent != target_dir and parent.is_dir():
+        try:
+            parent.rmdir()
+        except OSError:
+            break
+        parent = parent.parent
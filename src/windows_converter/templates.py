@@ -0,0 +1,86 @@
+"""Template rendering for the files generated by a build."""
+import re
+import threading
+from pathlib import Path
+
+from windows_converter import logger
+
+DATA_DIR = Path(Path(__file__).parent.parent, 'data')
+
+# Build files use <placeholder>; InstallForge files use <<placeholder>>
+# because InstallForge has <Tokens> of its own.
+BUILD_PLACEHOLDER = re.compile(r'<([a-z_]+)>')
+INSTALLFORGE_PLACEHOLDER = re.compile(r'<<([a-z ]+)>>')
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+class Template():
+    """A template split once into literal text and placeholders."""
+    def __init__(self, text: str, pattern: re.Pattern) -> None:
+        self.segments = []
+        self.placeholders = set()
+        position = 0
+        for match in pattern.finditer(text):
+            self.segments.append((text[position:match.start()], None))
+            self.segments.append((match.group(), match.group(1)))
+            self.placeholders.add(match.group(1))
+            position = match.end()
+        self.segments.append((text[position:], None))
+
+    def __repr__(self):
+        return f'Template: {sorted(self.placeholders)}'
+
+    def render(self, values: dict, name: str = '') -> str:
+        """Return the text with each placeholder replaced by its value.
+
+        Placeholders with no value are left in place and reported.
+        """
+        unfilled = self.placeholders - set(values)
+        if unfilled:
+            logger.warning(
+                f'Unfilled placeholders in {name}',
+                placeholders=sorted(unfilled))
+
+        output = []
+        for literal, key in self.segments:
+            if key is None:
+                output.append(literal)
+            else:
+                output.append(str(values.get(key, literal)))
+        return ''.join(output)
+
+
+def get_template(
+        file_name: str,
+        pattern: re.Pattern = BUILD_PLACEHOLDER,
+        ) -> Template:
+    """Return the compiled template, reloading it only if it has changed."""
+    src_file = Path(DATA_DIR, file_name)
+    try:
+        mtime = src_file.stat().st_mtime_ns
+    except FileNotFoundError:
+        logger.warning(f'{src_file} source not found')
+        return Template('', pattern)
+
+    key = (file_name, pattern.pattern)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    with open(src_file, 'r', encoding='utf-8') as f_source:
+        template = Template(f_source.read(), pattern)
+    with _cache_lock:
+        _cache[key] = (mtime, template)
+    return template
+
+
+def render(
+        file_name: str,
+        values: dict,
+        pattern: re.Pattern = BUILD_PLACEHOLDER,
+        ) -> str:
+    """Return the rendered text of the template file_name."""
+    return get_template(file_name, pattern).render(values, file_name)
@@ -10,7 +10,7 @@ Usage:
 """
 
 from dataclasses import dataclass, field
-from psiutils.text import Text as PsiText
+from functools import cache
 
 
 strings = {
@@ -22,23 +22,30 @@ class Text:
     """Combines package-level (psiutils) and project-level strings.
 
     Attributes from `psiutils.text.strings` are loaded first, then overridden
-    or extended by the local `strings` dictionary.
+    or extended by the local `strings` dictionary. The strings are merged
+    once per process, on the first attribute looked up.
     """
 
     display: bool = field(default=False, repr=False)
 
     def __post_init__(self) -> None:
-        """Populate the dataclass instance with string attributes."""
-        # Load psiutils strings
-        psi_text = PsiText()
-        psi_strings = psi_text.strings
-        for key, string in psi_strings.items():
-            setattr(self, key, string)
-
-        # Override or add project-level strings
-        for key, string in strings.items():
-            setattr(self, key, string)
-
         # Optionally display contents of `text`
         if self.display:
-            psi_text.display(strings)
+            _psi_text().display(strings)
+
+    def __getattr__(self, name: str) -> str:
+        try:
+            return _strings()[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+@cache
+def _psi_text():
+    from psiutils.text import Text as PsiText
+    return PsiText()
+
+
+@cache
+def _strings() -> dict[str, str]:
+    return {**_psi_text().strings, **strings}
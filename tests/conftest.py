@@ -0,0 +1,41 @@
+"""Shared fixtures for Windows app converter tests"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from windows_converter.config import read_config
+from windows_converter.projects import Project
+
+
+@pytest.fixture
+def make_project(tmp_path):
+    """Return a factory of small buildable projects and their config.
+
+    Every project is built into tmp_path/out, with the build's caches in
+    tmp_path/data; config_values are added to the config file.
+    """
+    def _make(name: str = 'app', **config_values) -> tuple[Project, object]:
+        dev_dir = Path(tmp_path, 'dev', name)
+        source_dir = Path(dev_dir, 'src', name)
+        Path(source_dir, 'images').mkdir(parents=True)
+        Path(source_dir, 'main.py').write_text('import os\n')
+        Path(dev_dir, 'tests').mkdir()
+        Path(dev_dir, 'requirements.txt').write_text('psiutils==0.2.12\n')
+
+        values = {
+            'build_base_dir': str(Path(tmp_path, 'out')),
+            'data_directory': str(Path(tmp_path, 'data')),
+            **config_values,
+        }
+        config_path = Path(tmp_path, 'config.toml')
+        config_path.write_text(''.join(
+            f'{key} = {json.dumps(value)}\n' for key, value in values.items()))
+
+        project = Project({
+            'name': name, 'exe_name': name.capitalize(),
+            'dev_base_dir': str(dev_dir), 'dev_source_dir': str(source_dir)})
+        project.resolve_directories()
+        return project, read_config(config_path)
+    return _make
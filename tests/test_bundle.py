@@ -0,0 +1,79 @@
+"""Bundle report tests for Windows app converter"""
+
+import pprint
+from pathlib import Path
+
+from windows_converter.bundle import analyze, main
+
+XREF = '''<html><body>
+<div class="node">
+  <a name="main.py"></a>
+  <div class="import">
+imports:
+    <a href="#app">app</a> &#8226; <a href="#tkinter">tkinter</a>
+  </div>
+</div>
+<div class="node">
+  <a name="app"></a>
+  <div class="import">
+imported by:
+    <a href="#main.py">main.py</a>
+  </div>
+</div>
+<div class="node">
+  <a name="tkinter"></a>
+</div>
+<div class="node">
+  <a name="numpy"></a>
+</div>
+</body></html>
+'''
+
+
+def _bundle(tmp_path: Path) -> tuple[Path, Path]:
+    files = Path(tmp_path, 'files')
+    files.mkdir()
+    sizes = {'app.py': 100, 'tkinter.py': 200, 'numpy.py': 3_000,
+             'big.png': 5_000}
+    for name, size in sizes.items():
+        Path(files, name).write_bytes(b'x' * size)
+
+    work_dir = Path(tmp_path, 'build', 'App')
+    work_dir.mkdir(parents=True)
+    pure = [(name, str(Path(files, f'{name}.py')), 'PYMODULE')
+            for name in ('app', 'tkinter', 'numpy')]
+    datas = [('images/big.png', str(Path(files, 'big.png')), 'DATA')]
+    toc = ('inputs', ['main.py'], pure, [], datas, [], False, {})
+    Path(work_dir, 'Analysis-00.toc').write_text(pprint.pformat(toc))
+    Path(work_dir, 'xref-App.html').write_text(XREF)
+    Path(work_dir, 'warn-App.txt').write_text(
+        'missing module named winreg - imported by platform (delayed)\n')
+
+    exe = Path(tmp_path, 'dist', 'App.exe')
+    exe.parent.mkdir()
+    exe.write_bytes(b'x' * 2_000_000)
+    return work_dir, exe
+
+
+def test_report_sizes_packages_and_suggests_exclusions(tmp_path):
+    work_dir, exe = _bundle(tmp_path)
+    report = analyze(work_dir, exe)
+
+    assert report.total_size == 2_000_000
+    assert report.packages == {
+        'app': 100, 'tkinter': 200, 'numpy': 3_000, 'images': 5_000}
+    assert report.data_files == {'images/big.png': 5_000}
+    assert report.exclude_suggestions == ['numpy']
+    assert report.missing_modules == ['winreg']
+    assert not report.over_budget
+    assert '--exclude-module=numpy' in report.format()
+
+
+def test_bundle_over_budget_fails(tmp_path, capsys):
+    work_dir, exe = _bundle(tmp_path)
+    json_path = Path(tmp_path, 'report.json')
+    assert main([str(work_dir), str(exe), '--budget', '1',
+                 '--json', str(json_path)]) == 1
+    assert 'exceeds' in capsys.readouterr().out
+    assert json_path.exists()
+    assert main([str(work_dir), str(exe), '--budget', '3']) == 0
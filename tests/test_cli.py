@@ -0,0 +1,48 @@
+"""Command line tests for Windows app converter"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from windows_converter import cli
+from windows_converter.projects import Project, ProjectServer
+
+SRC_DIR = Path(Path(__file__).parent.parent, 'src')
+
+
+def _modules_after(statement: str) -> set[str]:
+    code = f'import sys\n{statement}\nprint(" ".join(sys.modules))'
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    result = subprocess.run([sys.executable, '-c', code], env=env,
+                            capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+def test_build_imports_no_tkinter():
+    gui_modules = {'tkinter', 'windows_converter.root', 'psiutils.utilities',
+                   'psiutils.constants', 'psiutils.widgets'}
+    modules = _modules_after(
+        'import windows_converter.cli, windows_converter.build')
+    # Some psiutils releases import tkinter in the package itself
+    assert not (gui_modules & modules) - _modules_after('import psiutils')
+
+
+def test_build_exit_codes(tmp_path, monkeypatch):
+    server = ProjectServer(Path(tmp_path, 'projects.db'))
+    server.save_project(Project({
+        'name': 'app', 'dev_base_dir': str(tmp_path)}))
+    monkeypatch.setattr(cli, 'get_project_server', lambda: server)
+
+    assert cli.main(['build', 'missing']) == cli.EXIT_UNKNOWN_PROJECT
+    assert cli.main(['build', 'app']) == cli.EXIT_PROBLEMS
+
+
+def test_gui_arguments_are_passed_through(monkeypatch):
+    calls = []
+    monkeypatch.setattr(cli, '_run_gui', lambda argv: calls.append(argv))
+
+    cli.main(['project', 'app'])
+    cli.main(['config'])
+    cli.main([])
+    assert calls == [['project', 'app'], ['config'], []]
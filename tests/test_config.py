@@ -0,0 +1,57 @@
+"""Config tests for Windows app converter"""
+
+import os
+import threading
+from pathlib import Path
+
+from windows_converter.config import (
+    defer_update, flush_config, get_config, read_config)
+
+
+def test_config_is_shared_until_the_file_changes(tmp_path):
+    path = Path(tmp_path, 'config.toml')
+    path.write_text('author = "A"\n')
+    config = get_config(path)
+    assert get_config(path) is config
+
+    config.update('author', 'B')
+    config.save()
+    assert get_config(path) is config
+
+    path.write_text('author = "C"\n')
+    os.utime(path, ns=(0, 0))
+    changed = get_config(path)
+    assert changed is not config
+    assert changed.author == 'C'
+
+
+def test_deferred_updates_are_saved_together(tmp_path):
+    path = Path(tmp_path, 'config.toml')
+    path.write_text('last_project = ""\n')
+    for name in ('a', 'b', 'c'):
+        defer_update('last_project', name, path)
+    assert get_config(path).last_project == 'c'
+    assert 'last_project = ""' in path.read_text()
+
+    flush_config()
+    assert read_config(path).last_project == 'c'
+
+
+def test_saving_never_exposes_a_partial_file(tmp_path):
+    path = Path(tmp_path, 'config.toml')
+    path.write_text('author = "A"\n')
+    config = get_config(path)
+    config.update('author', 'B')
+
+    def save():
+        for _ in range(100):
+            config.save()
+
+    saver = threading.Thread(target=save)
+    saver.start()
+    authors = set()
+    while saver.is_alive():
+        authors.add(get_config(path).author)
+    saver.join()
+    assert authors <= {'B'}
+    assert sorted(os.listdir(tmp_path)) == ['config.toml']
@@ -0,0 +1,149 @@
+"""Copy and link engine tests for Windows app converter"""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from windows_converter import copier
+from windows_converter.copier import (
+    MODE_COPY, MODE_HARDLINK, MODE_REFLINK, MODE_SYMLINK, copy_file,
+    materialize_file, remove_file)
+from windows_converter.sinks import DirectorySink
+
+DATA = b'print("hello")\n' * 1000
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = Path(tmp_path, 'main.py')
+    path.write_bytes(DATA)
+    os.utime(path, (1_000_000_000, 1_000_000_000))
+    return path
+
+
+def _spy(monkeypatch, module, name: str, calls: list, error=None):
+    function = getattr(module, name)
+
+    def spy(*args, **kwargs):
+        calls.append(name)
+        if error:
+            raise error
+        return function(*args, **kwargs)
+
+    monkeypatch.setattr(module, name, spy)
+
+
+def test_copy_file_copies_data_and_mtime(tmp_path, source):
+    target = Path(tmp_path, 'copy.py')
+    assert copy_file(source, target) == len(DATA)
+    assert target.read_bytes() == DATA
+    assert target.stat().st_mtime == source.stat().st_mtime
+
+
+def test_copy_falls_back_to_sendfile(tmp_path, monkeypatch, source):
+    calls = []
+    monkeypatch.setattr(copier, '_reflink', lambda *args: False)
+    monkeypatch.delattr(os, 'copy_file_range', raising=False)
+    _spy(monkeypatch, os, 'sendfile', calls)
+    _spy(monkeypatch, shutil, 'copyfileobj', calls)
+
+    target = Path(tmp_path, 'copy.py')
+    copy_file(source, target)
+    assert target.read_bytes() == DATA
+    assert calls[0] == 'sendfile'
+    assert 'copyfileobj' not in calls
+
+
+def test_copy_restarts_with_a_stream_when_kernel_copies_fail(
+        tmp_path, monkeypatch, source):
+    calls = []
+
+    def copy_file_range(source_fd, target_fd, count):
+        # Fail part way through, after writing to the target
+        calls.append('copy_file_range')
+        os.write(target_fd, b'partial')
+        raise OSError('cross-device')
+
+    monkeypatch.setattr(copier, '_reflink', lambda *args: False)
+    monkeypatch.setattr(os, 'copy_file_range', copy_file_range,
+                        raising=False)
+    _spy(monkeypatch, os, 'sendfile', calls, OSError('not supported'))
+    _spy(monkeypatch, shutil, 'copyfileobj', calls)
+
+    target = Path(tmp_path, 'copy.py')
+    copy_file(source, target)
+    assert calls == ['copy_file_range', 'sendfile', 'copyfileobj']
+    assert target.read_bytes() == DATA
+
+
+def test_hardlink_and_fallback_to_copy(tmp_path, monkeypatch, source):
+    target = Path(tmp_path, 'link.py')
+    assert materialize_file(source, target, MODE_HARDLINK) == len(DATA)
+    assert os.path.samefile(source, target)
+
+    monkeypatch.setattr(os, 'link', _raise_os_error)
+    materialize_file(source, target, MODE_HARDLINK)
+    assert not os.path.samefile(source, target)
+    assert target.read_bytes() == DATA
+
+
+def test_symlink_and_fallback_to_copy(tmp_path, monkeypatch, source):
+    target = Path(tmp_path, 'link.py')
+    materialize_file(source, target, MODE_SYMLINK)
+    assert target.is_symlink()
+    assert target.resolve() == source.resolve()
+
+    monkeypatch.setattr(os, 'symlink', _raise_os_error)
+    materialize_file(source, target, MODE_SYMLINK)
+    assert not target.is_symlink()
+    assert target.read_bytes() == DATA
+
+
+def test_reflink_falls_back_to_copy(tmp_path, monkeypatch, source):
+    monkeypatch.setattr(copier, '_reflink', lambda *args: False)
+    target = Path(tmp_path, 'clone.py')
+    assert materialize_file(source, target, MODE_REFLINK) == len(DATA)
+    assert not os.path.samefile(source, target)
+    assert target.read_bytes() == DATA
+
+
+def test_invalid_mode_is_rejected(tmp_path, source):
+    with pytest.raises(ValueError):
+        materialize_file(source, Path(tmp_path, 'copy.py'), 'move')
+
+
+def test_hardlinked_target_is_replaced_not_written_through(
+        tmp_path, source):
+    target = Path(tmp_path, 'build', 'main.py')
+    target.parent.mkdir()
+    materialize_file(source, target, MODE_HARDLINK)
+
+    changed = Path(tmp_path, 'changed.py')
+    changed.write_bytes(b'print("changed")\n')
+    materialize_file(changed, target, MODE_COPY)
+    assert target.read_bytes() == b'print("changed")\n'
+    assert source.read_bytes() == DATA
+
+    sink = DirectorySink(Path(tmp_path, 'build'))
+    materialize_file(source, target, MODE_HARDLINK)
+    sink.write_bytes('main.py', b'rendered\n')
+    assert target.read_bytes() == b'rendered\n'
+    assert source.read_bytes() == DATA
+
+
+def test_remove_file_removes_links_not_their_targets(tmp_path, source):
+    dangling = Path(tmp_path, 'dangling.py')
+    dangling.symlink_to(Path(tmp_path, 'missing.py'))
+    linked = Path(tmp_path, 'linked.py')
+    linked.symlink_to(source)
+
+    for path in (dangling, linked, Path(tmp_path, 'absent.py')):
+        remove_file(path)
+        assert not path.is_symlink() and not path.exists()
+    assert source.read_bytes() == DATA
+
+
+def _raise_os_error(*args, **kwargs):
+    raise OSError('not permitted')
@@ -0,0 +1,29 @@
+"""Build fingerprint tests for Windows app converter"""
+
+from pathlib import Path
+
+from windows_converter.fingerprint import build_fingerprint
+
+
+def test_fingerprint_follows_inputs(make_project):
+    project, config = make_project()
+    fingerprint = build_fingerprint(project, config, {})
+    assert build_fingerprint(project, config, {}) == fingerprint
+
+    Path(project.dev_source_dir, 'main.py').write_text('import sys\n')
+    changed = build_fingerprint(project, config, {})
+    assert changed != fingerprint
+
+    project.version = '1.0.1'
+    assert build_fingerprint(project, config, {}) != changed
+
+
+def test_unchanged_build_is_up_to_date(make_project):
+    project, config = make_project()
+    assert not project.build(config).up_to_date
+    assert project.build(config).up_to_date
+    assert not project.build(config, force=True).up_to_date
+
+    Path(project.tests_directory, 'test_app.py').write_text('')
+    assert not project.build(config, incremental=True).up_to_date
+    assert project.build(config, incremental=True).up_to_date
@@ -0,0 +1,54 @@
+"""Import graph tests for Windows app converter"""
+
+from pathlib import Path
+
+from windows_converter.import_graph import (
+    POOL_THRESHOLD, hidden_imports, import_graph)
+
+
+def test_import_graph_resolves_relative_and_dynamic_imports(tmp_path):
+    package = Path(tmp_path, 'app')
+    Path(package, 'plugins').mkdir(parents=True)
+    Path(package, '__init__.py').write_text('')
+    Path(package, 'plugins', '__init__.py').write_text('')
+    Path(package, 'main.py').write_text(
+        'import importlib\n'
+        'from tkinter import ttk\n'
+        'from . import config\n'
+        'plugin = importlib.import_module("app.plugins.csv")\n'
+        'backend = __import__("sqlite3")\n'
+        'name = importlib.import_module(f"app.{plugin}")\n')
+    Path(package, 'plugins', 'csv.py').write_text('from ..config import X\n')
+
+    graph = import_graph(package)
+    assert graph['app.main']['dynamic'] == ['app.plugins.csv', 'sqlite3']
+    assert 'app.config' in graph['app.main']['static']
+    assert 'app.config.X' in graph['app.plugins.csv']['static']
+    assert hidden_imports(graph) == [
+        'app.plugins.csv', 'sqlite3', 'tkinter']
+
+
+def test_import_graph_is_cached_by_content(tmp_path, monkeypatch):
+    package = Path(tmp_path, 'app')
+    package.mkdir()
+    Path(package, 'main.py').write_text('import psiutils\n')
+
+    assert hidden_imports(
+        import_graph(package, 'app', cache_dir=tmp_path)) == [
+        'PIL._tkinter_finder', 'tkinter']
+    assert Path(tmp_path, 'app.json').is_file()
+    monkeypatch.setattr(
+        'windows_converter.import_graph.parse_imports', None)
+    assert import_graph(package, 'app', cache_dir=tmp_path) == {
+        'app.main': {'static': ['psiutils'], 'dynamic': []}}
+
+
+def test_import_graph_parses_in_a_process_pool(tmp_path):
+    package = Path(tmp_path, 'app')
+    package.mkdir()
+    for index in range(POOL_THRESHOLD):
+        Path(package, f'module_{index}.py').write_text(
+            f'import json\nfrom . import module_{index - 1}\n')
+
+    graph = import_graph(package, workers=2)
+    assert graph['app.module_3']['static'] == ['app', 'app.module_2', 'json']
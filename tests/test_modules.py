@@ -0,0 +1,24 @@
+"""Import check tests for Windows app converter"""
+
+from pathlib import Path
+
+from windows_converter.modules import check_imports
+
+
+def test_check_imports_caches_results(tmp_path, capsys):
+    source_dir = Path(tmp_path, 'app')
+    source_dir.mkdir()
+    Path(source_dir, 'config.py').write_text('VALUE = 1\n')
+    Path(source_dir, 'main.py').write_text(
+        'from config import VALUE\nfrom app.config import VALUE\n')
+    cache_file = Path(tmp_path, 'cache.json')
+
+    check_imports('app', source_dir, cache_file)
+    assert capsys.readouterr().out == 'main config from config import VALUE\n'
+    assert cache_file.is_file()
+
+    # Unchanged files are not read again but still reported
+    cached = cache_file.stat().st_mtime_ns
+    check_imports('app', source_dir, cache_file)
+    assert capsys.readouterr().out == 'main config from config import VALUE\n'
+    assert cache_file.stat().st_mtime_ns == cached
@@ -0,0 +1,154 @@
+"""Project store tests for Windows app converter"""
+
+import json
+import threading
+from pathlib import Path
+
+from windows_converter.project_store import (
+    JournalProjectStore, JsonProjectStore, SqliteProjectStore,
+    project_store)
+from windows_converter import projects
+from windows_converter.projects import (
+    Project, ProjectServer, get_project_server, switch_project_store)
+
+
+def test_sqlite_store_upserts_one_project(tmp_path):
+    store = SqliteProjectStore(Path(tmp_path, 'projects.db'))
+    store.save_all({'a': {'name': 'a'}, 'b': {'name': 'b'}})
+    store.save('a', {'name': 'a', 'version': '1.0.0'})
+
+    assert store.read('a') == {'name': 'a', 'version': '1.0.0'}
+    assert store.read('missing') is None
+    assert list(store.read_all()) == ['a', 'b']
+
+
+def test_sqlite_store_migrates_json(tmp_path):
+    json_path = Path(tmp_path, 'projects.json')
+    json_path.write_text(json.dumps({'app': {'name': 'app'}}))
+
+    store = project_store(Path(tmp_path, 'projects.db'), json_path)
+    assert isinstance(store, SqliteProjectStore)
+    assert store.read('app') == {'name': 'app'}
+
+
+def test_json_store_round_trip(tmp_path):
+    store = project_store(Path(tmp_path, 'projects.json'))
+    assert isinstance(store, JsonProjectStore)
+    store.save('app', {'name': 'app'})
+    assert store.read_all() == {'app': {'name': 'app'}}
+
+
+def test_projects_are_built_on_first_access(tmp_path):
+    server = ProjectServer(Path(tmp_path, 'projects.db'))
+    server.save_project(Project({'name': 'a'}))
+    server.save_project(Project({'name': 'b'}))
+
+    projects = ProjectServer(Path(tmp_path, 'projects.db')).projects
+    assert sorted(projects) == ['a', 'b']
+    assert not projects.loaded()
+    assert projects['a'].name == 'a'
+    assert list(projects.loaded()) == ['a']
+
+
+def test_project_server_is_shared_until_the_store_changes(tmp_path):
+    path = Path(tmp_path, 'projects.db')
+    server = get_project_server(path)
+    server.save_project(Project({'name': 'a'}))
+    assert get_project_server(path) is server
+
+    SqliteProjectStore(path).save('b', {'name': 'b'})
+    other = get_project_server(path)
+    assert other is not server
+    assert sorted(other.projects) == ['a', 'b']
+
+
+def test_journal_store_replays_over_snapshot(tmp_path):
+    path = Path(tmp_path, 'projects.jsonl')
+    Path(tmp_path, 'projects.json').write_text(
+        json.dumps({'a': {'name': 'a'}}))
+    store = project_store(path)
+    assert isinstance(store, JournalProjectStore)
+    store.save('b', {'name': 'b'})
+    store.save('a', {'name': 'a', 'version': '2'})
+
+    assert len(path.read_text().splitlines()) == 2
+    assert JournalProjectStore(path).read_all() == {
+        'a': {'name': 'a', 'version': '2'}, 'b': {'name': 'b'}}
+
+
+def test_journal_store_compacts_and_ignores_torn_records(tmp_path):
+    path = Path(tmp_path, 'projects.jsonl')
+    store = JournalProjectStore(path, compact_threshold=3)
+    for name in 'abc':
+        store.save(name, {'name': name})
+    store.wait()
+    assert path.read_text() == ''
+    assert sorted(json.loads(path.with_suffix('.json').read_text())) == [
+        'a', 'b', 'c']
+
+    with open(path, 'a', encoding='utf-8') as f_journal:
+        f_journal.write('{"id": "d", "da')
+    assert sorted(JournalProjectStore(path).read_all()) == ['a', 'b', 'c']
+
+    store = JournalProjectStore(path)
+    store.save('d', {'name': 'd'})
+    assert sorted(JournalProjectStore(path).read_all()) == [
+        'a', 'b', 'c', 'd']
+
+
+def test_journal_saves_carry_on_during_compaction(tmp_path):
+    path = Path(tmp_path, 'projects.jsonl')
+    store = JournalProjectStore(path)
+    store.save('a', {'name': 'a'})
+    writing, release = threading.Event(), threading.Event()
+    save_snapshot = store.snapshot.save_all
+
+    def slow_save_all(projects):
+        writing.set()
+        release.wait(5)
+        save_snapshot(projects)
+
+    store.snapshot.save_all = slow_save_all
+    compactor = threading.Thread(target=store.compact)
+    compactor.start()
+    assert writing.wait(5)
+    store.save('b', {'name': 'b'})
+    assert compactor.is_alive()
+    release.set()
+    compactor.join()
+
+    # Only the save the snapshot does not hold is left in the journal
+    assert json.loads(path.with_suffix('.json').read_text()) == {
+        'a': {'name': 'a'}}
+    assert [json.loads(line)['id']
+            for line in path.read_text().splitlines()] == ['b']
+    assert sorted(JournalProjectStore(path).read_all()) == ['a', 'b']
+
+
+def test_switching_store_migrates_the_projects(tmp_path, monkeypatch):
+    for kind, name in (('sqlite', 'projects.db'), ('journal', 'p.jsonl'),
+                       ('json', 'projects.json')):
+        monkeypatch.setitem(projects.STORE_PATHS, kind, Path(tmp_path, name))
+    SqliteProjectStore(projects.STORE_PATHS['sqlite']).save_all(
+        {'a': {'name': 'a'}, 'b': {'name': 'b'}})
+
+    switch_project_store('sqlite', 'journal')
+    journal = JournalProjectStore(projects.STORE_PATHS['journal'])
+    journal.save('b', {'name': 'b', 'version': '2'})
+    switch_project_store('journal', 'json')
+
+    assert JsonProjectStore(projects.STORE_PATHS['json']).read_all() == {
+        'a': {'name': 'a'}, 'b': {'name': 'b', 'version': '2'}}
+
+
+def test_project_directories_missing_at_first_are_found_later(tmp_path):
+    base_dir = Path(tmp_path, 'app')
+    Path(base_dir, 'src', 'images').mkdir(parents=True)
+    project = Project({'dev_base_dir': str(base_dir)})
+    project.resolve_directories()
+    assert project.tests_directory is None
+
+    Path(base_dir, 'tests').mkdir()
+    project = Project({'dev_base_dir': str(base_dir)})
+    project.resolve_directories()
+    assert project.tests_directory == str(Path(base_dir, 'tests'))
@@ -0,0 +1,95 @@
+"""Requirements cache tests for Windows app converter"""
+
+import subprocess
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from windows_converter import requirements
+from windows_converter.requirements import create_requirements
+
+
+@pytest.fixture
+def venv_project(tmp_path):
+    dev_base_dir = Path(tmp_path, 'app')
+    site_packages = Path(
+        dev_base_dir, '.venv', 'lib', 'python3.12', 'site-packages')
+    Path(site_packages, 'pip').mkdir(parents=True)
+    Path(site_packages, 'click-8.1.dist-info').mkdir()
+    Path(dev_base_dir, 'uv.lock').write_text('version = 1\n')
+    return SimpleNamespace(name='app', dev_base_dir=str(dev_base_dir))
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return Path(tmp_path, 'cache')
+
+
+@pytest.fixture
+def commands(monkeypatch):
+    calls = []
+
+    def run(args, **kwargs):
+        calls.append(args)
+        return subprocess.CompletedProcess(
+            args, 0, stdout='click==8.1\npygobject==3.48\n')
+
+    monkeypatch.setattr(subprocess, 'run', run)
+    return calls
+
+
+def _freezes(calls: list) -> int:
+    return sum(args[:3] == ['uv', 'pip', 'freeze'] for args in calls)
+
+
+def test_unchanged_venv_skips_the_freeze(venv_project, commands, cache_dir):
+    assert create_requirements(venv_project, cache_dir)
+    req_path = Path(venv_project.dev_base_dir, 'requirements.txt')
+    assert req_path.read_text() == 'click==8.1\n'
+
+    req_path.unlink()
+    assert create_requirements(venv_project, cache_dir)
+    assert _freezes(commands) == 1
+    assert req_path.read_text() == 'click==8.1\n'
+
+
+def test_ensurepip_is_skipped_when_pip_is_installed(
+        venv_project, commands, cache_dir):
+    assert create_requirements(venv_project, cache_dir)
+    assert not any('ensurepip' in args for args in commands)
+
+
+def test_ensurepip_runs_without_pip(venv_project, commands, cache_dir):
+    site_packages, = requirements._site_packages(
+        Path(venv_project.dev_base_dir, '.venv'))
+    Path(site_packages, 'pip').rmdir()
+    assert create_requirements(venv_project, cache_dir)
+    assert [args[1:] for args in commands if 'ensurepip' in args] == [
+        ['-m', 'ensurepip', '--upgrade']]
+    assert _freezes(commands) == 1
+
+
+def test_lock_or_dist_info_change_invalidates_the_cache(
+        venv_project, commands, cache_dir):
+    create_requirements(venv_project, cache_dir)
+
+    Path(venv_project.dev_base_dir, 'uv.lock').write_text('version = 2\n')
+    create_requirements(venv_project, cache_dir)
+    assert _freezes(commands) == 2
+
+    site_packages, = requirements._site_packages(
+        Path(venv_project.dev_base_dir, '.venv'))
+    Path(site_packages, 'rich-13.7.dist-info').mkdir()
+    create_requirements(venv_project, cache_dir)
+    assert _freezes(commands) == 3
+
+    create_requirements(venv_project, cache_dir)
+    assert _freezes(commands) == 3
+
+
+def test_build_keeps_the_freeze_cache_in_the_data_directory(
+        make_project, commands):
+    project, config = make_project()
+    project.build(config, update_requirements=True)
+    assert Path(config.data_directory, 'requirements', 'app.json').is_file()
@@ -0,0 +1,39 @@
+"""Build scheduler tests for Windows app converter"""
+
+from windows_converter.scheduler import (
+    PRIORITY_INTERACTIVE, STATUS_OK, BuildScheduler, build_many)
+
+
+def test_build_many_builds_in_worker_processes(make_project):
+    projects = []
+    for name in ('alpha', 'beta', 'gamma'):
+        project, config = make_project(name)
+        projects.append(project)
+
+    summaries = build_many(projects, config, max_workers=2)
+    assert sorted(summary.project for summary in summaries) == [
+        'alpha', 'beta', 'gamma']
+    for summary in summaries:
+        assert (summary.status, summary.error) == (STATUS_OK, '')
+        # main.py is the only source or tests file
+        assert (summary.files_copied, summary.bytes_copied) == (1, 10)
+
+
+def test_interactive_build_starts_before_queued_batch_builds(make_project):
+    projects = {}
+    for name in ('first', 'batch', 'interactive'):
+        projects[name], config = make_project(name)
+
+    scheduler = BuildScheduler(config, max_workers=1)
+    try:
+        # Hold the lock so nothing finishes until everything is queued
+        with scheduler._lock:
+            scheduler.submit(projects['first'])
+            scheduler.submit(projects['batch'])
+            scheduler.submit(projects['interactive'],
+                             priority=PRIORITY_INTERACTIVE)
+        summaries = scheduler.wait()
+    finally:
+        scheduler.shutdown()
+    assert [summary.project for summary in summaries] == [
+        'first', 'interactive', 'batch']
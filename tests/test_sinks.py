@@ -0,0 +1,138 @@
+"""Output sink tests for Windows app converter"""
+
+import io
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from windows_converter import sinks
+from windows_converter.sinks import output_sink
+
+
+@pytest.mark.parametrize('kind', ['zip', 'tar'])
+def test_archive_sink_round_trip(tmp_path, kind):
+    source = Path(tmp_path, 'main.py')
+    source.write_bytes(b'print("hello")\n' * 1000)
+    sink = output_sink(kind, Path(tmp_path, 'out', 'app'), workers=4)
+    for index in range(20):
+        sink.write_file(f'src/app/module_{index}.py', source)
+    sink.write_bytes('justfile', b'build:\n')
+    sink.write_directory('setup')
+    sink.close()
+
+    if kind == 'zip':
+        with zipfile.ZipFile(sink.path) as archive:
+            assert archive.testzip() is None
+            names = archive.namelist()
+            data = archive.read('app/src/app/module_7.py')
+    else:
+        with tarfile.open(sink.path, 'r:gz') as archive:
+            names = [name + '/' if archive.getmember(name).isdir() else name
+                     for name in archive.getnames()]
+            data = archive.extractfile('app/src/app/module_7.py').read()
+    assert len(names) == 22
+    assert {'app/justfile', 'app/setup/'} <= set(names)
+    assert data == source.read_bytes()
+    assert not Path(f'{sink.path}.tmp').exists()
+
+
+def _read_archive(kind: str, path: Path) -> dict[str, bytes]:
+    if kind == 'zip':
+        with zipfile.ZipFile(path) as archive:
+            assert archive.testzip() is None
+            return {name: archive.read(name) for name in archive.namelist()}
+    with tarfile.open(path, 'r:gz') as archive:
+        return {member.name: archive.extractfile(member).read()
+                for member in archive.getmembers() if member.isfile()}
+
+
+@pytest.mark.parametrize('kind', ['zip', 'tar'])
+def test_archive_sink_streams_large_files(tmp_path, monkeypatch, kind):
+    # Read in small chunks and spill to disk as a large file would
+    monkeypatch.setattr(sinks, 'STREAM_BUFFER_SIZE', 4096)
+    monkeypatch.setattr(sinks, 'SPOOL_SIZE', 8192)
+    random_data = os.urandom(100_000)
+    text_data = b'0123456789abcdef' * 10_000
+    for name, data in (('random.bin', random_data), ('text.txt', text_data)):
+        Path(tmp_path, name).write_bytes(data)
+    sink = output_sink(kind, Path(tmp_path, 'out', 'app'), workers=2)
+    sink.write_file('random.bin', Path(tmp_path, 'random.bin'))
+    sink.write_file('text.txt', Path(tmp_path, 'text.txt'))
+    sink.close()
+
+    assert _read_archive(kind, sink.path) == {
+        'app/random.bin': random_data, 'app/text.txt': text_data}
+    assert sorted(os.listdir(sink.path.parent)) == [sink.path.name]
+
+
+@pytest.mark.parametrize('kind', ['zip', 'tar'])
+def test_archive_sink_keeps_file_modes(tmp_path, kind):
+    script = Path(tmp_path, 'run.sh')
+    script.write_text('#!/bin/sh\n')
+    script.chmod(0o755)
+    sink = output_sink(kind, Path(tmp_path, 'out', 'app'))
+    sink.write_file('run.sh', script)
+    sink.write_bytes('justfile', b'build:\n')
+    sink.close()
+
+    if kind == 'zip':
+        with zipfile.ZipFile(sink.path) as archive:
+            modes = {info.filename: info.external_attr >> 16 & 0o777
+                     for info in archive.infolist()}
+    else:
+        with tarfile.open(sink.path, 'r:gz') as archive:
+            modes = {member.name: member.mode
+                     for member in archive.getmembers()}
+    assert modes == {'app/run.sh': 0o755, 'app/justfile': 0o644}
+
+
+def test_zip_stored_entry_matches_the_data_stored(tmp_path, monkeypatch):
+    # The file changes between compressing it and storing it instead
+    stored = os.urandom(500)
+    reads = iter([os.urandom(1200), stored])
+    sink = output_sink('zip', Path(tmp_path, 'out', 'app'))
+    sink._submit('app/data.bin', 0, 1200, 0o644,
+                 lambda: io.BytesIO(next(reads)))
+    sink.close()
+
+    with zipfile.ZipFile(sink.path) as archive:
+        assert archive.testzip() is None
+        assert archive.read('app/data.bin') == stored
+
+
+def test_zip_sink_writes_zip64_records(tmp_path, monkeypatch):
+    # Small limits stand in for 4 GiB and 65,535 entries
+    monkeypatch.setattr(sinks, 'ZIP_LIMIT', 1000)
+    monkeypatch.setattr(sinks, 'ZIP_MAX_ENTRIES', 3)
+    data = os.urandom(5000)
+    sink = output_sink('zip', Path(tmp_path, 'out', 'app'))
+    for index in range(4):
+        sink.write_bytes(f'file_{index}.bin', data)
+    sink.write_directory('setup')
+    sink.close()
+
+    with zipfile.ZipFile(sink.path) as archive:
+        assert archive.testzip() is None
+        infos = archive.infolist()
+        assert [info.file_size for info in infos] == [5000] * 4 + [0]
+        assert archive.read('app/file_3.bin') == data
+    assert b'PK\x06\x06' in sink.path.read_bytes()
+
+
+@pytest.mark.parametrize('keep_build_dir', [False, True])
+def test_build_writes_archive(tmp_path, make_project, keep_build_dir):
+    project, config = make_project(
+        output_sink='zip', keep_build_dir=keep_build_dir)
+
+    report = project.build(config)
+    assert 'archive' in [stage.name for stage in report.stages]
+    with zipfile.ZipFile(Path(tmp_path, 'out', 'app.zip')) as archive:
+        names = set(archive.namelist())
+    assert {'app/src/app/main.py', 'app/src/app/build_exe.py',
+            'app/justfile', 'app/app.ifp'} <= names
+    assert not any('.build_' in name for name in names)
+    assert Path(tmp_path, 'out', 'app').is_dir() == keep_build_dir
+    assert project.build(config).up_to_date
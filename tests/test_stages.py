@@ -0,0 +1,65 @@
+"""Build stage tests for Windows app converter"""
+
+import pickle
+import threading
+
+import pytest
+
+from windows_converter.metrics import count
+from windows_converter.stages import Stage, run_stages
+
+
+def test_stages_run_after_their_requirements():
+    order = []
+    stages = [
+        Stage('copy', lambda: order.append('copy'), requires=('dirs',)),
+        Stage('mkdir', lambda: order.append('mkdir'), provides=('dirs',)),
+    ]
+    run_stages(stages)
+    assert order == ['mkdir', 'copy']
+
+
+def test_independent_stages_overlap():
+    barrier = threading.Barrier(2, timeout=5)
+    stages = [
+        Stage('freeze', barrier.wait),
+        Stage('copy', barrier.wait),
+    ]
+    results = run_stages(stages)
+    assert sorted(results) == ['copy', 'freeze']
+
+
+def test_failed_stage_stops_dependants():
+    ran = []
+
+    def fail():
+        raise OSError('disk full')
+
+    stages = [
+        Stage('mkdir', fail, provides=('dirs',)),
+        Stage('copy', lambda: ran.append('copy'), requires=('dirs',)),
+    ]
+    with pytest.raises(OSError):
+        run_stages(stages)
+    assert not ran
+
+
+def test_unknown_requirement_is_rejected():
+    with pytest.raises(ValueError):
+        run_stages([Stage('copy', lambda: None, requires=('dirs',))])
+
+
+def test_stage_metrics_are_recorded():
+    def copy():
+        count(2, 100)
+        count(size=50)
+
+    metrics = []
+    run_stages([Stage('copy', copy), Stage('idle', lambda: None)],
+               metrics=metrics)
+    by_name = {stage.name: stage for stage in metrics}
+    assert (by_name['copy'].files, by_name['copy'].bytes) == (3, 150)
+    assert (by_name['idle'].files, by_name['idle'].bytes) == (0, 0)
+    assert by_name['copy'].duration >= 0
+    # Reports go back to the scheduler from worker processes
+    assert pickle.loads(pickle.dumps(metrics)) == metrics
@@ -0,0 +1,64 @@
+"""Startup time tests for Windows app converter"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(Path(__file__).parent.parent, 'src')
+
+# Budgets (ms) for importing the GUI and for reaching the Tk main loop
+IMPORT_BUDGET_MS = 400
+MAINLOOP_BUDGET_MS = 1500
+
+# Import what Root() imports to show the main form, then list the modules
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import windows_converter.root
+import windows_converter.forms.frm_main
+print(round((time.perf_counter() - start) * 1000))
+print(' '.join(sorted(sys.modules)))
+"""
+
+# Patch mainloop to report the time taken to reach it, then quit
+MAINLOOP_SCRIPT = """
+import sys, time, tkinter
+start = time.perf_counter()
+def mainloop(self, n=0):
+    print(round((time.perf_counter() - start) * 1000))
+    self.destroy()
+tkinter.Misc.mainloop = mainloop
+sys.argv = ['windows_converter']
+from windows_converter.root import Root
+Root()
+"""
+
+
+def _run(*args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    return subprocess.run([sys.executable, *args],
+                          capture_output=True, text=True, env=env)
+
+
+def test_gui_import_is_within_budget():
+    result = _run('-c', IMPORT_SCRIPT)
+    if result.returncode:
+        pytest.skip(f'GUI dependencies not importable: {result.stderr[-200:]}')
+
+    elapsed, modules = result.stdout.splitlines()[-2:]
+    assert int(elapsed) < IMPORT_BUDGET_MS
+    # Forms and the build machinery are imported when first used
+    for module in ('windows_converter.forms.frm_project',
+                   'windows_converter.forms.frm_config',
+                   'windows_converter.build'):
+        assert module not in modules.split()
+
+
+def test_time_to_mainloop_is_within_budget():
+    result = _run('-c', MAINLOOP_SCRIPT)
+    if result.returncode:
+        pytest.skip(f'GUI cannot start here: {result.stderr[-200:]}')
+    assert int(result.stdout.split()[-1]) < MAINLOOP_BUDGET_MS
@@ -0,0 +1,84 @@
+"""Incremental sync tests for Windows app converter"""
+
+import os
+from pathlib import Path
+
+from windows_converter import sync
+from windows_converter.sync import file_hash, sync_tree
+
+
+def _write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding='utf-8')
+
+
+def test_first_sync_copies_everything(tmp_path):
+    source = Path(tmp_path, 'source')
+    target = Path(tmp_path, 'target')
+    _write(Path(source, 'main.py'), 'print(1)')
+    _write(Path(source, 'images', 'icon.png'), 'png')
+
+    result, manifest = sync_tree(source, target, {})
+
+    assert result.copied == 2
+    assert result.bytes_copied == 11
+    assert sorted(manifest) == ['images/icon.png', 'main.py']
+    assert Path(target, 'images', 'icon.png').read_text() == 'png'
+
+
+def test_first_sync_reads_each_file_once(tmp_path, monkeypatch):
+    source = Path(tmp_path, 'source')
+    _write(Path(source, 'main.py'), 'print(1)')
+    hashed = []
+    monkeypatch.setattr(sync, 'file_hash',
+                        lambda path: hashed.append(path) or file_hash(path))
+
+    _, manifest = sync_tree(source, Path(tmp_path, 'target'), {})
+    assert not hashed
+    assert manifest['main.py']['hash'] == file_hash(Path(source, 'main.py'))
+
+
+def test_unchanged_files_are_skipped(tmp_path):
+    source = Path(tmp_path, 'source')
+    target = Path(tmp_path, 'target')
+    _write(Path(source, 'main.py'), 'print(1)')
+    _write(Path(source, 'other.py'), 'print(2)')
+    _, manifest = sync_tree(source, target, {})
+
+    _write(Path(source, 'main.py'), 'print(3)')
+    result, manifest = sync_tree(source, target, manifest)
+
+    assert result.copied == 1
+    assert result.unchanged == 1
+    assert Path(target, 'main.py').read_text() == 'print(3)'
+
+
+def test_touched_file_with_same_content_is_not_copied(tmp_path):
+    source = Path(tmp_path, 'source')
+    target = Path(tmp_path, 'target')
+    _write(Path(source, 'main.py'), 'print(1)')
+    _, manifest = sync_tree(source, target, {})
+
+    stat = Path(source, 'main.py').stat()
+    os.utime(Path(source, 'main.py'),
+             ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    result, _ = sync_tree(source, target, manifest)
+
+    assert result.copied == 0
+    assert result.unchanged == 1
+
+
+def test_stale_files_are_deleted(tmp_path):
+    source = Path(tmp_path, 'source')
+    target = Path(tmp_path, 'target')
+    _write(Path(source, 'main.py'), 'print(1)')
+    _write(Path(source, 'old', 'old.py'), 'print(2)')
+    _, manifest = sync_tree(source, target, {})
+
+    Path(source, 'old', 'old.py').unlink()
+    Path(source, 'old').rmdir()
+    result, manifest = sync_tree(source, target, manifest)
+
+    assert result.deleted == 1
+    assert not Path(target, 'old').exists()
+    assert list(manifest) == ['main.py']
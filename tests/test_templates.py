@@ -0,0 +1,132 @@
+"""Template tests for Windows app converter"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from windows_converter.build import (
+    ONEFILE_EXE_SIZE, _installforge_files)
+from windows_converter.projects import Project
+from windows_converter.templates import (
+    Template, BUILD_PLACEHOLDER, INSTALLFORGE_PLACEHOLDER, get_template,
+    render)
+
+
+def test_render_substitutes_every_occurrence():
+    template = Template('<project> = "<project>.main:<exe_name>"',
+                       BUILD_PLACEHOLDER)
+    text = template.render({'project': 'app', 'exe_name': 'App'})
+    assert text == 'app = "app.main:App"'
+
+
+def test_unfilled_placeholders_are_left_in_place():
+    template = Template('name=<project> email=<email>', BUILD_PLACEHOLDER)
+    assert template.placeholders == {'project', 'email'}
+    assert template.render({'project': 'app'}) == 'name=app email=<email>'
+
+
+def test_installforge_tokens_are_not_placeholders():
+    template = Template('<InstallPath>\\<<exe name>>.exe <main>',
+                        INSTALLFORGE_PLACEHOLDER)
+    assert template.placeholders == {'exe name'}
+    text = template.render({'exe name': 'App'})
+    assert text == '<InstallPath>\\App.exe <main>'
+
+
+def test_templates_are_cached():
+    assert get_template('justfile') is get_template('justfile')
+
+
+def test_build_exe_template_renders_valid_python():
+    text = render('build_exe.py', {
+        'exe_name': 'App', 'build_profile': 'dev',
+        'hidden_imports': 'tkinter', 'size_budget_mb': 25.0})
+    assert "SIZE_BUDGET_MB = float('25.0' or 0)" in text
+    assert "PROFILE = sys.argv[1] if len(sys.argv) > 1 else 'dev'" in text
+    compile(text, 'build_exe.py', 'exec')
+
+
+def test_installforge_lists_onedir_dist(tmp_path):
+    project = Project({
+        'name': 'app', 'exe_name': 'App', 'win_source_dir': 'C:\\app',
+        'build_profile': 'onedir'})
+    dist_dir = Path(tmp_path, 'dist', 'App')
+    Path(dist_dir, '_internal').mkdir(parents=True)
+    Path(dist_dir, 'App.exe').write_bytes(b'x' * 3 * 1024 * 1024)
+    Path(dist_dir, '_internal', 'base.zip').write_bytes(b'x' * 2048)
+
+    assert _installforge_files(project, tmp_path).splitlines() == [
+        'C:\\app\\dist\\App\\App.exe', '3 MB', 'exe',
+        'C:\\app\\dist\\App\\_internal', '2 KB', 'Folder',
+    ]
+    # The one-file exe is listed even before PyInstaller has run
+    project.build_profile = 'release'
+    assert _installforge_files(project, tmp_path).splitlines() == [
+        'C:\\app\\dist\\App.exe', ONEFILE_EXE_SIZE, 'exe']
+    Path(tmp_path, 'dist', 'App.exe').write_bytes(b'x' * 5000)
+    assert _installforge_files(project, tmp_path).splitlines() == [
+        'C:\\app\\dist\\App.exe', '5 KB', 'exe']
+
+
+def test_release_installer_lists_the_exe_without_a_dist_tree(make_project):
+    project, config = make_project()
+    project.win_source_dir = 'C:\\app'
+    project.build_profile = 'release'
+    project.build(config)
+
+    installer = Path(config.build_base_dir, 'app', 'app.ifp').read_text()
+    assert (f'[Files/Dirs]\nC:\\app\\dist\\App.exe\n{ONEFILE_EXE_SIZE}\n'
+            f'exe\n[Licence_Begin]') in installer
+
+
+def test_full_build_keeps_and_lists_the_dist_tree(make_project):
+    project, config = make_project()
+    project.win_source_dir = 'C:\\app'
+    project.build_profile = 'onedir'
+    assert not project.build(config).up_to_date
+
+    build_project_dir = Path(config.build_base_dir, 'app')
+    dist_dir = Path(build_project_dir, 'dist', 'App')
+    Path(dist_dir, '_internal').mkdir(parents=True)
+    Path(dist_dir, 'App.exe').write_bytes(b'x' * 2048)
+    # The new dist tree makes the build out of date
+    assert not project.build(config).up_to_date
+
+    assert Path(dist_dir, 'App.exe').is_file()
+    installer = Path(build_project_dir, 'app.ifp').read_text()
+    assert 'C:\\app\\dist\\App\\App.exe\n2 KB\nexe\n' in installer
+
+
+def test_build_exe_imports_its_report_as_module_or_script(
+        tmp_path, make_project):
+    project, config = make_project()
+    project.build(config)
+    src_dir = Path(config.build_base_dir, 'app', 'src')
+    assert Path(src_dir, 'app', '_wc_bundle_report.py').is_file()
+
+    # A stand-in for PyInstaller, which only runs on the build machine
+    fakes = Path(tmp_path, 'fakes')
+    Path(fakes, 'PyInstaller', 'utils').mkdir(parents=True)
+    for package in ('PyInstaller', 'PyInstaller/utils'):
+        Path(fakes, package, '__init__.py').write_text('')
+    Path(fakes, 'PyInstaller', '__main__.py').write_text('')
+    Path(fakes, 'PyInstaller', 'utils', 'hooks.py').write_text(
+        'def collect_data_files(package):\n    return []\n')
+
+    build_exe = Path(src_dir, 'app', 'build_exe.py')
+    for code in ('import app.build_exe',
+                 f'import runpy; runpy.run_path({str(build_exe)!r})'):
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+            [str(src_dir), str(build_exe.parent), str(fakes)]))
+        subprocess.run([sys.executable, '-c', code], env=env, check=True)
+
+
+def test_justfile_runs_the_exe_for_the_build_profile(make_project):
+    project, config = make_project()
+    for profile, exe in (('release', 'dist\\App.exe'),
+                         ('onedir', 'dist\\App\\App.exe')):
+        project.build_profile = profile
+        project.build(config)
+        justfile = Path(config.build_base_dir, 'app', 'justfile')
+        assert f'exe:\n    {exe}\n' in justfile.read_text()